@@ -1,10 +1,14 @@
 import argparse
 import sys
+import time
 from pathlib import Path
 
+import numpy as np
+
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from twenty48.env import Twenty48Env
+from twenty48.vec_env import VecTwenty48Env
 
 
 def play_game(seed: int) -> int:
@@ -19,14 +23,66 @@ def play_game(seed: int) -> int:
     return env.score
 
 
+def compare_step(steps: int, seed: int) -> None:
+    rates = {}
+    for mode in ("step", "step_fast"):
+        env = Twenty48Env()
+        env.reset(seed=seed)
+        step_fn = getattr(env, mode)
+        done = False
+        start = time.perf_counter()
+        for _ in range(steps):
+            if done:
+                env.reset()
+            done = step_fn(env.rng.randrange(4))[2]
+        rates[mode] = steps / (time.perf_counter() - start)
+    print(
+        f"steps={steps} step={rates['step']:.0f}/s step_fast={rates['step_fast']:.0f}/s "
+        f"speedup={rates['step_fast'] / rates['step']:.1f}x"
+    )
+
+
+def run_vectorized(num_envs: int, steps: int, seed: int) -> None:
+    env = VecTwenty48Env(num_envs, seed=seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    finished = []
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, dones, _ = env.step(rng.integers(0, 4, size=num_envs))
+        if np.any(dones):
+            finished.extend(env.final_scores[dones].tolist())
+    elapsed = time.perf_counter() - start
+    total = num_envs * steps
+    avg_score = sum(finished) / len(finished) if finished else 0.0
+    print(
+        f"num_envs={num_envs} steps={total} elapsed={elapsed:.2f}s "
+        f"steps_per_sec={total / elapsed:.0f} games={len(finished)} avg_score={avg_score:.2f}"
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--num-envs", type=int, default=None, help="benchmark VecTwenty48Env with N boards")
+    parser.add_argument("--steps", type=int, default=1000, help="steps for --num-envs (batched) or --compare-step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare-step", action="store_true", help="compare Twenty48Env.step and step_fast")
     args = parser.parse_args()
 
+    if args.compare_step:
+        compare_step(args.steps, args.seed)
+        return
+
+    if args.num_envs is not None:
+        run_vectorized(args.num_envs, args.steps, args.seed)
+        return
+
+    start = time.perf_counter()
     scores = [play_game(seed) for seed in range(args.games)]
+    elapsed = time.perf_counter() - start
     avg_score = sum(scores) / len(scores)
-    print(f"games={args.games} avg_score={avg_score:.2f} max_score={max(scores)}")
+    print(f"games={args.games} avg_score={avg_score:.2f} max_score={max(scores)} elapsed={elapsed:.2f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from twenty48.env import Twenty48Env
+from twenty48.ai.book import Book, BookBuilder
+from twenty48.ai.expectimax import ExpectimaxSearcher
+from twenty48.ai.transposition import TranspositionTable
+from twenty48.bitboard import canonical
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=1000, help="seeded games whose openings are recorded")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plies", type=int, default=8, help="opening moves recorded per game")
+    parser.add_argument("--play-depth", type=int, default=2, help="expectimax depth used to play the openings")
+    parser.add_argument("--depth", type=int, default=5, help="expectimax depth used to solve book positions")
+    parser.add_argument("--min-prob", type=float, default=1e-4)
+    parser.add_argument("--max-fours", type=int, default=None)
+    parser.add_argument("--table-entries", type=int, default=None)
+    parser.add_argument("--merge", type=str, default=None, help="existing book to extend")
+    parser.add_argument("--out", type=str, default="data/books/opening.npy")
+    parser.add_argument("--progress-every", type=int, default=100)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    builder = BookBuilder.from_book(Book.open(args.merge)) if args.merge else BookBuilder()
+    start = time.perf_counter()
+
+    positions = {}
+    env = Twenty48Env()
+    player = ExpectimaxSearcher(depth=args.play_depth, table=TranspositionTable(args.table_entries))
+    for game in range(args.games):
+        env.reset(seed=args.seed + game)
+        for _ in range(args.plies):
+            key = canonical(env.packed)[0]
+            if key not in builder:
+                positions[key] = None
+            _, _, done, _ = env.step(player.choose_action(env))
+            if done:
+                break
+    if not args.quiet:
+        print(f"positions={len(positions)} existing={len(builder)} elapsed={time.perf_counter() - start:.1f}s")
+
+    solver = ExpectimaxSearcher(
+        depth=args.depth,
+        table=TranspositionTable(args.table_entries),
+        min_prob=args.min_prob,
+        max_fours=args.max_fours,
+    )
+    progress_every = max(1, int(args.progress_every))
+    for idx, board in enumerate(positions, start=1):
+        action, value = solver.search(board)
+        if value != float("-inf"):
+            builder.add(board, action, value)
+        if not args.quiet and (idx % progress_every == 0 or idx == len(positions)):
+            print(f"[{idx}/{len(positions)}] entries={len(builder)} elapsed={time.perf_counter() - start:.1f}s")
+
+    meta = {
+        "depth": args.depth,
+        "min_prob": args.min_prob,
+        "max_fours": args.max_fours,
+        "games": args.games,
+        "seed": args.seed,
+        "plies": args.plies,
+    }
+    out_path = builder.write(args.out, meta)
+    if not args.quiet:
+        print(f"saved: {out_path} entries={len(builder)}")
+
+
+if __name__ == "__main__":
+    main()
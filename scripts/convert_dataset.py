@@ -0,0 +1,29 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from twenty48.ml.storage import LAYOUTS, convert_to_npy_dir, open_npy_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert an .npz or manifest dataset to a memory-mappable .npy directory")
+    parser.add_argument("--src", type=str, required=True, help=".npz file or generate_dataset.py manifest")
+    parser.add_argument("--out", type=str, required=True, help="output directory (an existing dataset directory is replaced)")
+    parser.add_argument("--layout", type=str, choices=list(LAYOUTS), default="same", help="board layout of the output")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out = convert_to_npy_dir(args.src, args.out, layout=args.layout)
+    if not args.quiet:
+        arrays = open_npy_dir(out)
+        size = sum(array.nbytes for array in arrays.values())
+        rows = arrays["actions"].shape[0]
+        print(f"saved: {out} rows={rows} bytes={size} elapsed={time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,123 @@
 import argparse
-import random
+import functools
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-
-import numpy as np
+from typing import Tuple
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from twenty48.env import Twenty48Env
-from twenty48.ai.expectimax import choose_action
+from twenty48.ai.book import Book, BookAgent
+from twenty48.ai.expectimax import adaptive_depth
+from twenty48.ai.parallel import ParallelExpectimax
+from twenty48.ml.generate import (
+    DEFAULT_CHUNK_SIZE,
+    ChunkWriter,
+    GenerateConfig,
+    generate_shard,
+    manifest_path,
+    merge_manifest,
+    play_game,
+    remove_manifest,
+    shard_path,
+    write_manifest,
+)
+
+
+def _report(args, games_done: int, games_played: int, steps: int, samples: int, start_time: float) -> None:
+    elapsed = time.perf_counter() - start_time
+    eta = elapsed / max(1, games_played) * max(0, args.num_games - games_done)
+    print(f"[{games_done}/{args.num_games}] steps={steps} samples={samples} elapsed={elapsed:.1f}s eta={eta:.1f}s")
+
+
+def _generate_serial(args, config: GenerateConfig, out_path: Path, start_time: float) -> Tuple[int, int]:
+    """Stream games into chunk files next to ``out_path``; memory stays at one chunk.
+
+    Without ``--chunk-size`` the chunks are merged into ``out_path`` and
+    removed at the end; with it the chunks and their manifest are the output.
+    """
+    book = Book.open(args.book) if args.book else None
+    # Searchers that keep no per-game state are shared by all games.
+    shared = None
+    if args.batched:
+        shared = config.make_searcher()
+    elif args.search_workers:
+        shared = ParallelExpectimax(
+            workers=args.search_workers,
+            depth=args.depth,
+            max_cells=args.max_cells,
+            min_prob=args.min_prob,
+            max_fours=args.max_fours,
+            table_entries=args.table_entries,
+            symmetry=args.symmetry,
+            depth_policy=functools.partial(adaptive_depth, max_depth=args.depth) if args.depth_policy == "adaptive" else None,
+        )
+
+    writer = ChunkWriter(out_path, config, chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE, resume=args.resume)
+    finished = set(writer.completed)
+    total_steps = writer.steps
+    total_samples = 0
+    games_played = 0
+    env = Twenty48Env()
+    progress_every = max(1, int(args.progress_every))
+    for game_idx in range(args.num_games):
+        game_seed = args.seed + game_idx if args.seed is not None else None
+        if game_seed in finished:
+            continue
+        searcher = shared or config.make_searcher()
+        if book is not None:
+            searcher = BookAgent(book, searcher)
+        game_steps, game_samples = play_game(env, searcher, game_seed, config, writer)
+        total_steps += game_steps
+        total_samples += game_samples
+        games_played += 1
+        done_games = game_idx + 1
+        if not args.quiet and (done_games % progress_every == 0 or games_played == 1 or done_games == args.num_games):
+            _report(args, done_games, games_played, total_steps, total_samples, start_time)
+
+    if isinstance(shared, ParallelExpectimax):
+        shared.close()
+    manifest = writer.close()
+    if not args.chunk_size:
+        merge_manifest(manifest, out_path)
+        remove_manifest(manifest)
+    return total_steps, writer.rows
+
+
+def _generate_sharded(args, config: GenerateConfig, out_path: Path, start_time: float) -> Tuple[int, int]:
+    """Stream fixed seed ranges of ``--shard-games`` games as chunked shards on a process pool.
+
+    The top-level manifest is rewritten as shards finish, so it always lists
+    the complete ones; with ``--resume`` each shard skips its finished games.
+    Without ``--chunk-size`` the shards are merged into ``out_path`` and
+    removed at the end, as in the serial path.
+    """
+    shard_games = max(1, int(args.shard_games))
+    chunk_size = args.chunk_size or DEFAULT_CHUNK_SIZE
+    tasks = [
+        (config, args.seed + first, min(shard_games, args.num_games - first), str(shard_path(out_path, index)), chunk_size, args.resume)
+        for index, first in enumerate(range(0, args.num_games, shard_games))
+    ]
+    shards = []
+    games_done = games_played = total_steps = total_samples = 0
+    with ProcessPoolExecutor(max_workers=max(1, int(args.workers))) as executor:
+        futures = [executor.submit(generate_shard, *task) for task in tasks]
+        for future in as_completed(futures):
+            shard = future.result()
+            games_played += shard.pop("played")
+            shards.append(shard)
+            write_manifest(manifest_path(out_path), config, shards)
+            games_done += shard["games"]
+            total_steps += shard["steps"]
+            total_samples += shard["samples"]
+            if not args.quiet:
+                _report(args, games_done, games_played, total_steps, total_samples, start_time)
+    if not args.chunk_size:
+        merge_manifest(manifest_path(out_path), out_path)
+        remove_manifest(manifest_path(out_path))
+    return total_steps, total_samples
 
 
 def main() -> None:
@@ -22,6 +130,26 @@ def main() -> None:
     parser.add_argument("--include-invalid", action="store_true")
     parser.add_argument("--max-steps", type=int, default=None)
     parser.add_argument("--max-cells", type=int, default=4)
+    parser.add_argument("--table-entries", type=int, default=None, help="expectimax transposition table size")
+    parser.add_argument("--min-prob", type=float, default=None, help="expectimax probability cutoff (replaces --max-cells)")
+    parser.add_argument("--max-fours", type=int, default=None, help="max 4-spawns expanded per path with --min-prob")
+    parser.add_argument("--time-ms", type=float, default=None, help="expectimax per-move budget; --depth becomes the max depth")
+    parser.add_argument("--search-workers", type=int, default=None, help="root-parallel expectimax processes")
+    parser.add_argument("--symmetry", action="store_true", help="share expectimax table entries across board symmetries")
+    parser.add_argument("--batched", action="store_true", help="level-synchronous expectimax over every empty cell (ignores --max-cells)")
+    parser.add_argument("--depth-policy", choices=["fixed", "adaptive"], default="fixed", help="adaptive: per-move depth from board complexity, up to --depth")
+    parser.add_argument("--max-nodes", type=int, default=None, help="expectimax per-move node budget; --depth becomes the max depth")
+    parser.add_argument("--book", type=str, default=None, help="position book consulted before expectimax")
+    parser.add_argument("--workers", type=int, default=None, help="play --shard-games seed ranges on N processes; output is the same for any N")
+    parser.add_argument("--shard-games", type=int, default=10, help="games per shard with --workers")
+    parser.add_argument("--packed", action="store_true", help="store boards as uint64 exponent nibbles (8 bytes instead of 32)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help=f"samples per chunk file (default {DEFAULT_CHUNK_SIZE}); keep the chunks and a manifest as the output instead of merging them into --out",
+    )
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted seeded run, skipping finished games")
     parser.add_argument("--progress-every", type=int, default=10)
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("--log-file", type=str, default=".artifacts/generate_dataset_last.log")
@@ -30,86 +158,42 @@ def main() -> None:
     out_path = Path(args.out) if args.out else Path("data/raw") / f"dataset_expectimax_depth{args.depth}_games{args.num_games}.npz"
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    rng = random.Random(args.seed)
-
-    boards = []
-    actions = []
-    scores = []
-    rewards = []
-    max_tiles = []
-    dones = []
-    step_indices = []
-    seeds = []
-    depths = []
-
-    env = Twenty48Env()
-
-    total_steps = 0
-    total_samples = 0
+    if args.batched and (args.time_ms is not None or args.min_prob is not None or args.search_workers or args.max_nodes):
+        parser.error("--batched does not support --time-ms, --max-nodes, --min-prob or --search-workers")
+    if args.search_workers and args.max_nodes:
+        parser.error("--search-workers does not support --max-nodes")
+    if args.search_workers and args.time_ms is not None:
+        parser.error("--search-workers does not support --time-ms")
+    if args.workers is not None and (args.seed is None or args.search_workers):
+        parser.error("--workers needs --seed and does not support --search-workers")
+    if args.resume and args.seed is None:
+        parser.error("--resume needs --seed")
+
+    config = GenerateConfig(
+        depth=args.depth,
+        max_cells=args.max_cells,
+        table_entries=args.table_entries,
+        min_prob=args.min_prob,
+        max_fours=args.max_fours,
+        time_ms=args.time_ms,
+        symmetry=args.symmetry,
+        batched=args.batched,
+        depth_policy=args.depth_policy,
+        max_nodes=args.max_nodes,
+        book=args.book,
+        sample_prob=args.sample_prob,
+        include_invalid=args.include_invalid,
+        max_steps=args.max_steps,
+        packed=args.packed,
+    )
     start_time = time.perf_counter()
-    progress_every = max(1, int(args.progress_every))
+    if args.workers is None:
+        total_steps, total_samples = _generate_serial(args, config, out_path, start_time)
+    else:
+        total_steps, total_samples = _generate_sharded(args, config, out_path, start_time)
+    if args.chunk_size:
+        out_path = manifest_path(out_path)
 
-    for game_idx in range(args.num_games):
-        game_seed = args.seed + game_idx if args.seed is not None else None
-        env.reset(seed=game_seed)
-        done = False
-        step = 0
-        game_steps = 0
-        game_samples = 0
-        while not done:
-            action = choose_action(env, args.depth, max_cells=args.max_cells)
-            board_before = env.board.copy()
-            _, reward, done, info = env.step(action)
-
-            if info["invalid_move"] and not args.include_invalid:
-                step += 1
-                continue
-
-            if rng.random() <= args.sample_prob:
-                boards.append(board_before.astype(np.int16))
-                actions.append(action)
-                scores.append(info["score"])
-                rewards.append(reward)
-                max_tiles.append(info["max_tile"])
-                dones.append(done)
-                step_indices.append(step)
-                seeds.append(-1 if game_seed is None else int(game_seed))
-                depths.append(args.depth)
-                game_samples += 1
-
-            step += 1
-            game_steps += 1
-            if args.max_steps is not None and step >= args.max_steps:
-                break
-
-        total_steps += game_steps
-        total_samples += game_samples
-        if not args.quiet and (
-            (game_idx + 1) % progress_every == 0
-            or game_idx == 0
-            or (game_idx + 1) == args.num_games
-        ):
-            elapsed = time.perf_counter() - start_time
-            avg_per_game = elapsed / (game_idx + 1)
-            remaining = max(0, args.num_games - (game_idx + 1))
-            eta = avg_per_game * remaining
-            print(
-                f"[{game_idx + 1}/{args.num_games}] steps={total_steps} "
-                f"samples={total_samples} elapsed={elapsed:.1f}s eta={eta:.1f}s"
-            )
-
-    np.savez_compressed(
-        out_path,
-        boards=np.asarray(boards, dtype=np.int16),
-        actions=np.asarray(actions, dtype=np.uint8),
-        scores=np.asarray(scores, dtype=np.int32),
-        rewards=np.asarray(rewards, dtype=np.int32),
-        max_tiles=np.asarray(max_tiles, dtype=np.int16),
-        dones=np.asarray(dones, dtype=np.bool_),
-        step_indices=np.asarray(step_indices, dtype=np.int32),
-        seeds=np.asarray(seeds, dtype=np.int32),
-        depths=np.asarray(depths, dtype=np.int16),
-    )
     elapsed = time.perf_counter() - start_time
     if not args.quiet:
         print(
@@ -127,6 +211,21 @@ def main() -> None:
                     f"num_games={args.num_games}",
                     f"depth={args.depth}",
                     f"max_cells={args.max_cells}",
+                    f"table_entries={args.table_entries}",
+                    f"min_prob={args.min_prob}",
+                    f"max_fours={args.max_fours}",
+                    f"time_ms={args.time_ms}",
+                    f"search_workers={args.search_workers}",
+                    f"workers={args.workers}",
+                    f"shard_games={args.shard_games if args.workers is not None else None}",
+                    f"chunk_size={args.chunk_size}",
+                    f"packed={args.packed}",
+                    f"resume={args.resume}",
+                    f"symmetry={args.symmetry}",
+                    f"batched={args.batched}",
+                    f"depth_policy={args.depth_policy}",
+                    f"max_nodes={args.max_nodes}",
+                    f"book={args.book}",
                     f"max_steps={args.max_steps}",
                     f"sample_prob={args.sample_prob}",
                     f"seed={args.seed}",
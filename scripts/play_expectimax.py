@@ -5,7 +5,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from twenty48.env import Twenty48Env
-from twenty48.ai.expectimax import choose_action
+from twenty48.ai.expectimax import ExpectimaxSearcher
 
 
 ACTION_NAMES = {
@@ -25,10 +25,11 @@ def main() -> None:
     env = Twenty48Env()
     env.reset(seed=args.seed)
 
+    searcher = ExpectimaxSearcher(depth=args.depth)
     done = False
     step = 0
     while not done:
-        action = choose_action(env, args.depth)
+        action = searcher.choose_action(env)
         _, reward, done, info = env.step(action)
         print(
             "Step {step} | action={action} | reward={reward} | score={score} | max_tile={max_tile} | "
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import csv
 import json
 import random
@@ -12,7 +13,16 @@ import numpy as np
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from twenty48.env import Twenty48Env
-from twenty48.ai.expectimax import apply_move, choose_action
+from twenty48.ai.batched import BatchedExpectimax
+from twenty48.ai.book import Book, BookAgent
+from twenty48.ai.expectimax import DepthPolicy, Evaluator, ExpectimaxSearcher, adaptive_depth
+from twenty48.ai.heuristics import TableEvaluator
+from twenty48.ai.montecarlo import ROLLOUT_POLICIES, MonteCarloAgent
+from twenty48.ai.ntuple import NTupleNetwork
+from twenty48.ai.parallel import ParallelExpectimax
+from twenty48.ai.stats import SearchStats
+from twenty48.ai.transposition import TranspositionTable
+from twenty48.bitboard import actions_from_mask, legal_actions
 from twenty48.ml.inference import select_action
 from twenty48.ml.model import PolicyNet
 import torch
@@ -25,15 +35,6 @@ def _parse_seeds(seeds_str: str | None) -> list[int] | None:
     return [int(p) for p in parts]
 
 
-def _valid_actions(board) -> list[int]:
-    actions = []
-    for action in (0, 1, 2, 3):
-        _, _, moved = apply_move(board, action)
-        if moved:
-            actions.append(action)
-    return actions
-
-
 def run_one_game(
     agent: str,
     seed: int,
@@ -43,9 +44,46 @@ def run_one_game(
     device: str = "cpu",
     max_pow: int = 15,
     max_cells: int = 4,
+    table_entries: int | None = None,
+    min_prob: float | None = None,
+    max_fours: int | None = None,
+    time_ms: float | None = None,
+    symmetry: bool = False,
+    batched: bool = False,
+    max_nodes: int | None = None,
+    depth_policy: DepthPolicy | None = None,
+    parallel: ParallelExpectimax | None = None,
+    search_stats: SearchStats | None = None,
+    network: NTupleNetwork | None = None,
+    mc_agent: MonteCarloAgent | None = None,
+    book: Book | None = None,
+    evaluator: Evaluator | None = None,
 ) -> dict:
     env = Twenty48Env()
     env.reset(seed=seed)
+    searcher = parallel
+    if agent == "expectimax" and searcher is None and batched:
+        searcher = BatchedExpectimax(depth=depth, depth_policy=depth_policy)
+    elif agent == "expectimax" and searcher is None:
+        searcher = ExpectimaxSearcher(
+            depth=depth,
+            max_cells=max_cells,
+            table=TranspositionTable(table_entries),
+            min_prob=min_prob,
+            max_fours=max_fours,
+            time_ms=time_ms,
+            symmetry=symmetry,
+            max_nodes=max_nodes,
+            depth_policy=depth_policy,
+            # N-tuple values estimate future score, so move rewards count at full weight.
+            reward_weight=1.0 if network is not None else 0.0,
+            evaluator=network.state_value if network is not None else evaluator,
+        )
+
+    if searcher is not None and book is not None:
+        searcher = BookAgent(book, searcher)
+    if mc_agent is not None:
+        mc_agent.reset(seed)
 
     rng = random.Random(seed)
     invalid_count = 0
@@ -55,20 +93,24 @@ def run_one_game(
 
     done = False
     while not done and steps < max_steps:
+        mask = legal_actions(env.packed)
         if agent == "random":
-            actions = _valid_actions(env.board)
+            actions = list(actions_from_mask(mask))
             if not actions:
                 break
             action = rng.choice(actions)
         elif agent == "expectimax":
-            action = choose_action(env, depth, max_cells=max_cells)
+            action = searcher.choose_action(env, search_stats)
+        elif agent == "mc":
+            action = mc_agent.choose_action(env)
+        elif agent == "ntuple":
+            action = network.choose_action(env)
         elif agent == "policy":
             action = select_action(env.board, model, max_pow=max_pow, device=device)
         else:
             raise ValueError(f"Unknown agent: {agent}")
 
-        _, _, moved = apply_move(env.board, action)
-        if moved:
+        if mask >> action & 1:
             moved_steps += 1
 
         _, _, done, info = env.step(action)
@@ -119,6 +161,26 @@ def _summary_stats(scores: np.ndarray, max_tiles: np.ndarray, invalid_rates: np.
     return summary
 
 
+def _print_search_summary(search: dict) -> None:
+    print("Search")
+    for key in [
+        "searches",
+        "visits_per_search",
+        "ms_per_search",
+        "leaf_evals",
+        "hit_rate",
+        "peak_table_size",
+        "pruned",
+    ]:
+        value = search[key]
+        if isinstance(value, float):
+            print(f"- {key}: {value:.4f}")
+        else:
+            print(f"- {key}: {value}")
+    for depth, seconds in search["depth_times"].items():
+        print(f"- depth_{depth}_sec: {seconds:.4f}")
+
+
 def _print_summary(agent: str, summary: dict, quiet: bool) -> None:
     if quiet:
         print(
@@ -159,14 +221,30 @@ def _print_summary(agent: str, summary: dict, quiet: bool) -> None:
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--agent", type=str, choices=["random", "expectimax", "policy"], required=True)
+    parser.add_argument("--agent", type=str, choices=["random", "expectimax", "policy", "ntuple", "mc"], required=True)
     parser.add_argument("-n", "--games", type=int, default=100)
     parser.add_argument("--seed", type=int, default=0)
     parser.add_argument("--seeds", type=str, default=None)
     parser.add_argument("--max-steps", type=int, default=20000)
     parser.add_argument("--depth", type=int, default=3)
     parser.add_argument("--max-cells", type=int, default=4)
+    parser.add_argument("--table-entries", type=int, default=None, help="expectimax transposition table size")
+    parser.add_argument("--min-prob", type=float, default=None, help="expectimax probability cutoff (replaces --max-cells)")
+    parser.add_argument("--max-fours", type=int, default=None, help="max 4-spawns expanded per path with --min-prob")
+    parser.add_argument("--time-ms", type=float, default=None, help="expectimax per-move budget; --depth becomes the max depth")
+    parser.add_argument("--search-workers", type=int, default=None, help="root-parallel expectimax / Monte Carlo processes")
+    parser.add_argument("--symmetry", action="store_true", help="share expectimax table entries across board symmetries")
+    parser.add_argument("--batched", action="store_true", help="level-synchronous expectimax over every empty cell (ignores --max-cells)")
+    parser.add_argument("--depth-policy", choices=["fixed", "adaptive"], default="fixed", help="adaptive: per-move depth from board complexity, up to --depth")
+    parser.add_argument("--max-nodes", type=int, default=None, help="expectimax per-move node budget; --depth becomes the max depth")
     parser.add_argument("--model", type=str, default="data/models/policy_best.pt")
+    parser.add_argument("--ntuple", type=str, default="data/models/ntuple.npy", help="n-tuple weights for --agent ntuple / --leaf ntuple")
+    parser.add_argument("--rollouts", type=int, default=100, help="mc rollouts per legal move")
+    parser.add_argument("--horizon", type=int, default=20, help="mc rollout length in moves")
+    parser.add_argument("--rollout-policy", type=str, choices=list(ROLLOUT_POLICIES), default="random")
+    parser.add_argument("--book", type=str, default=None, help="position book consulted before expectimax")
+    parser.add_argument("--weights", type=str, default=None, help="heuristic weights JSON (e.g. from tune_weights.py)")
+    parser.add_argument("--leaf", type=str, choices=["heuristic", "ntuple"], default="heuristic", help="expectimax leaf evaluator")
     parser.add_argument("--out-json", type=str, default=None)
     parser.add_argument("--out-csv", type=str, default=None)
     parser.add_argument("--quiet", action="store_true")
@@ -202,11 +280,57 @@ def main() -> None:
         model.load_state_dict(torch.load(model_path, map_location=device))
         model.eval()
 
+    network = None
+    if args.agent == "ntuple" or (args.agent == "expectimax" and args.leaf == "ntuple"):
+        if args.leaf == "ntuple" and (args.batched or args.search_workers):
+            parser.error("--leaf ntuple does not support --batched or --search-workers")
+        network = NTupleNetwork.load(args.ntuple)
+
+    evaluator = None
+    if args.agent == "expectimax" and args.weights:
+        if args.leaf == "ntuple" or args.batched or args.search_workers:
+            parser.error("--weights does not support --leaf ntuple, --batched or --search-workers")
+        evaluator = TableEvaluator(json.loads(Path(args.weights).read_text(encoding="utf-8"))["weights"])
+
+    if args.batched and (args.time_ms is not None or args.min_prob is not None or args.search_workers or args.max_nodes):
+        parser.error("--batched does not support --time-ms, --max-nodes, --min-prob or --search-workers")
+    if args.search_workers and args.max_nodes:
+        parser.error("--search-workers does not support --max-nodes")
+    depth_policy = functools.partial(adaptive_depth, max_depth=args.depth) if args.depth_policy == "adaptive" else None
+
+    book = Book.open(args.book) if args.agent == "expectimax" and args.book else None
+
+    mc_agent = None
+    if args.agent == "mc":
+        mc_agent = MonteCarloAgent(
+            rollouts=args.rollouts,
+            horizon=args.horizon,
+            policy=args.rollout_policy,
+            workers=args.search_workers or 1,
+        )
+
+    parallel = None
+    if args.agent == "expectimax" and args.search_workers:
+        if args.time_ms is not None:
+            parser.error("--search-workers does not support --time-ms")
+        parallel = ParallelExpectimax(
+            workers=args.search_workers,
+            depth=args.depth,
+            max_cells=args.max_cells,
+            min_prob=args.min_prob,
+            max_fours=args.max_fours,
+            table_entries=args.table_entries,
+            symmetry=args.symmetry,
+            depth_policy=depth_policy,
+        )
+
     per_game = []
     total_games = len(seeds)
     progress_every = 5 if total_games < 50 else 10
     start_all = time.perf_counter()
+    total_search = SearchStats()
     for idx, seed in enumerate(seeds, start=1):
+        game_search = SearchStats() if args.agent == "expectimax" else None
         result = run_one_game(
             agent=args.agent,
             seed=int(seed),
@@ -216,7 +340,24 @@ def main() -> None:
             device=device,
             max_pow=max_pow,
             max_cells=args.max_cells,
+            table_entries=args.table_entries,
+            min_prob=args.min_prob,
+            max_fours=args.max_fours,
+            time_ms=args.time_ms,
+            symmetry=args.symmetry,
+            batched=args.batched,
+            max_nodes=args.max_nodes,
+            depth_policy=depth_policy,
+            parallel=parallel,
+            search_stats=game_search,
+            network=network,
+            mc_agent=mc_agent,
+            book=book,
+            evaluator=evaluator,
         )
+        if game_search is not None:
+            result["search"] = game_search.as_dict()
+            total_search.merge(game_search)
         per_game.append(result)
         if not args.quiet and (idx % progress_every == 0 or idx == total_games):
             scores_so_far = np.array([g["final_score"] for g in per_game], dtype=np.float64)
@@ -233,13 +374,22 @@ def main() -> None:
                 f"p90={p90:.1f} invalid={invalid_rate:.4f} elapsed={elapsed:.1f}s eta={remaining:.1f}s"
             )
 
+    if parallel is not None:
+        parallel.close()
+    if mc_agent is not None:
+        mc_agent.close()
+
     scores = np.array([g["final_score"] for g in per_game], dtype=np.float64)
     max_tiles = np.array([g["max_tile"] for g in per_game], dtype=np.float64)
     invalid_rates = np.array([g["invalid_rate"] for g in per_game], dtype=np.float64)
     durations = np.array([g["duration_ms"] for g in per_game], dtype=np.float64)
 
     summary = _summary_stats(scores, max_tiles, invalid_rates, durations)
+    if args.agent == "expectimax":
+        summary["search"] = total_search.as_dict()
     _print_summary(args.agent, summary, args.quiet)
+    if args.agent == "expectimax" and not args.quiet:
+        _print_search_summary(summary["search"])
 
     with out_csv.open("w", newline="", encoding="utf-8") as handle:
         writer = csv.DictWriter(
@@ -265,7 +415,23 @@ def main() -> None:
             "agent": args.agent,
             "depth": args.depth,
             "max_cells": args.max_cells,
+            "table_entries": args.table_entries,
+            "min_prob": args.min_prob,
+            "max_fours": args.max_fours,
+            "time_ms": args.time_ms,
+            "search_workers": args.search_workers,
+            "symmetry": args.symmetry,
+            "batched": args.batched,
+            "depth_policy": args.depth_policy,
+            "max_nodes": args.max_nodes,
             "model": args.model if args.agent == "policy" else None,
+            "ntuple": args.ntuple if network is not None else None,
+            "leaf": args.leaf if args.agent == "expectimax" else None,
+            "book": args.book if book is not None else None,
+            "weights": evaluator.weights if evaluator is not None else None,
+            "rollouts": args.rollouts if args.agent == "mc" else None,
+            "horizon": args.horizon if args.agent == "mc" else None,
+            "rollout_policy": args.rollout_policy if args.agent == "mc" else None,
             "seeds": seeds,
             "max_steps": args.max_steps,
         },
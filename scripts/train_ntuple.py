@@ -0,0 +1,55 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from twenty48.ai.ntuple import PATTERNS_4, PATTERNS_6, NTupleNetwork, train_td
+
+PATTERN_SETS = {"4": PATTERNS_4, "6": PATTERNS_6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--lr", type=float, default=0.1, help="fraction of the TD error corrected per update")
+    parser.add_argument("--lam", type=float, default=0.0, help="TD(lambda); 0 trains online TD(0)")
+    parser.add_argument("--patterns", type=str, choices=sorted(PATTERN_SETS), default="4", help="4-tuples or 6-tuples")
+    parser.add_argument("--init", type=str, default=None, help="continue training from saved weights")
+    parser.add_argument("--out", type=str, default="data/models/ntuple.npy")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--progress-every", type=int, default=100)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    if args.init:
+        network = NTupleNetwork.load(args.init, mmap_mode=None)
+    else:
+        network = NTupleNetwork(PATTERN_SETS[args.patterns])
+
+    scores = []
+    progress_every = max(1, int(args.progress_every))
+    start = time.perf_counter()
+
+    def report(episode: int, score: int) -> None:
+        scores.append(score)
+        done = episode + 1
+        if not args.quiet and (done % progress_every == 0 or done == args.episodes):
+            recent = np.array(scores[-progress_every:], dtype=np.float64)
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{done}/{args.episodes}] mean={recent.mean():.1f} max={recent.max():.0f} "
+                f"elapsed={elapsed:.1f}s"
+            )
+
+    train_td(network, args.episodes, learning_rate=args.lr, lam=args.lam, seed=args.seed, callback=report)
+    out_path = network.save(args.out)
+    if not args.quiet:
+        print(f"saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ def main() -> None:
     parser.add_argument("--max-pow", type=int, default=15)
     parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--device", type=str, default="auto", help="auto|cpu|cuda")
+    parser.add_argument("--per-sample-loading", action="store_true", help="encode and collate one sample at a time (slower)")
     parser.add_argument("--log-file", type=str, default=".artifacts/train_last.log")
     parser.add_argument("--metrics-csv", type=str, default=".artifacts/train_metrics.csv")
     args = parser.parse_args()
@@ -35,6 +36,7 @@ def main() -> None:
         log_file=args.log_file,
         metrics_csv=args.metrics_csv,
         run_info={"command": " ".join(sys.argv)},
+        batch_loading=not args.per_sample_loading,
     )
 
 
@@ -0,0 +1,70 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from twenty48.ai.tuning import WEIGHT_NAMES, CrossEntropyTuner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--generations", type=int, default=20, help="total generations, including resumed ones")
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--elite-frac", type=float, default=0.25)
+    parser.add_argument("--games", type=int, default=8, help="games per candidate, on seeds shared by the generation")
+    parser.add_argument("--race-rounds", type=int, default=2, help="rounds of games between racing eliminations")
+    parser.add_argument("--race-z", type=float, default=2.0, help="standard errors a loser must trail by")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--init-std", type=float, default=1.0)
+    parser.add_argument("--extra-std", type=float, default=0.05, help="noise added to the refitted std")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", type=str, default=".artifacts/tune_weights.json", help="resumed when it exists")
+    parser.add_argument("--out", type=str, default="data/weights/tuned.json")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(entry: dict) -> None:
+        if args.quiet:
+            return
+        weights = " ".join(f"{name}={entry['mean_weights'][name]:.3f}" for name in WEIGHT_NAMES)
+        print(
+            f"[{entry['generation']}/{args.generations}] best={entry['best_score']:.1f} "
+            f"elite={entry['elite_score']:.1f} eliminated={entry['eliminated']} "
+            f"games={entry['games_played']} elapsed={time.perf_counter() - start:.1f}s {weights}"
+        )
+
+    with CrossEntropyTuner(
+        std=args.init_std,
+        population=args.population,
+        elite_frac=args.elite_frac,
+        games=args.games,
+        race_rounds=args.race_rounds,
+        race_z=args.race_z,
+        depth=args.depth,
+        max_steps=args.max_steps,
+        extra_std=args.extra_std,
+        seed=args.seed,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+    ) as tuner:
+        if tuner.generation and not args.quiet:
+            print(f"resumed: {args.checkpoint} generation={tuner.generation}")
+        weights = tuner.run(args.generations, callback=report)
+        best = tuner.best
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps({"weights": weights, "best": best}, indent=2), encoding="utf-8")
+    if not args.quiet:
+        print(f"saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
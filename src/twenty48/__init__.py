@@ -1,3 +1,4 @@
 from .env import Twenty48Env
+from .vec_env import VecTwenty48Env
 
-__all__ = ["Twenty48Env"]
+__all__ = ["Twenty48Env", "VecTwenty48Env"]
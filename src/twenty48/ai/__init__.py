@@ -1,4 +1,27 @@
-from .expectimax import choose_action
-from .heuristics import evaluate
+from .batched import BatchedExpectimax
+from .book import Book, BookAgent, BookBuilder
+from .expectimax import ExpectimaxSearcher, choose_action
+from .heuristics import TableEvaluator, evaluate, evaluate_batch, evaluate_packed
+from .montecarlo import MonteCarloAgent
+from .ntuple import NTupleNetwork
+from .stats import SearchStats
+from .transposition import TranspositionTable
+from .tuning import CrossEntropyTuner
 
-__all__ = ["choose_action", "evaluate"]
+__all__ = [
+    "BatchedExpectimax",
+    "Book",
+    "BookAgent",
+    "BookBuilder",
+    "CrossEntropyTuner",
+    "ExpectimaxSearcher",
+    "MonteCarloAgent",
+    "NTupleNetwork",
+    "SearchStats",
+    "TableEvaluator",
+    "TranspositionTable",
+    "choose_action",
+    "evaluate",
+    "evaluate_batch",
+    "evaluate_packed",
+]
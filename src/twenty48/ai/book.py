@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from twenty48.bitboard import INVERSE_SYMMETRY_ACTIONS, SYMMETRY_ACTIONS, canonical
+
+from .expectimax import ActionValue
+from .stats import SearchStats
+
+# Per-key payload, stored next to the sorted uint64 keys; actions are in the canonical orientation.
+MOVE_DTYPE = np.dtype([("action", "u1"), ("value", "<f4")])
+
+
+class Book:
+    """Read-only position book: sorted canonical board keys with their best action and value.
+
+    A book is ``<name>.npy`` (sorted uint64 keys), ``<name>.moves.npy``
+    (``MOVE_DTYPE`` records) and ``<name>.meta.json``. Both arrays are
+    memory-mapped, so processes opening the same book share its pages;
+    lookups canonicalize the board, binary-search the keys and map the
+    stored action back to the board's orientation.
+    """
+
+    def __init__(self, keys: np.ndarray, moves: np.ndarray, meta: Dict | None = None) -> None:
+        if keys.dtype != np.uint64 or moves.dtype != MOVE_DTYPE or keys.shape != moves.shape:
+            raise ValueError("Book needs matching uint64 keys and MOVE_DTYPE records")
+        self.keys = keys
+        self.moves = moves
+        self.meta = dict(meta or {})
+        self._actions = moves["action"]
+        self._values = moves["value"]
+
+    @classmethod
+    def open(cls, path: str | Path, mmap_mode: str | None = "r") -> "Book":
+        path = Path(path).with_suffix(".npy")
+        meta_path = path.with_suffix(".meta.json")
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        keys = np.load(path, mmap_mode=mmap_mode)
+        return cls(keys, np.load(path.with_suffix(".moves.npy"), mmap_mode=mmap_mode), meta)
+
+    def __len__(self) -> int:
+        return int(self.keys.shape[0])
+
+    def __contains__(self, board: int) -> bool:
+        return self.lookup(board) is not None
+
+    def lookup(self, board: int) -> ActionValue | None:
+        """(action, value) stored for a board or any of its symmetries, else None."""
+        key, symmetry = canonical(board)
+        key = np.uint64(key)
+        index = int(np.searchsorted(self.keys, key))
+        if index == len(self) or self.keys[index] != key:
+            return None
+        return INVERSE_SYMMETRY_ACTIONS[symmetry][int(self._actions[index])], float(self._values[index])
+
+
+class BookBuilder:
+    """Collects searched (board, action, value) results and writes them as a ``Book`` file."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[int, float]] = {}
+
+    @classmethod
+    def from_book(cls, book: Book) -> "BookBuilder":
+        builder = cls()
+        for key, action, value in zip(book.keys.tolist(), book._actions.tolist(), book._values.tolist()):
+            builder._entries[key] = (action, value)
+        return builder
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, board: int) -> bool:
+        return canonical(board)[0] in self._entries
+
+    def add(self, board: int, action: int, value: float) -> None:
+        key, symmetry = canonical(board)
+        self._entries[key] = (SYMMETRY_ACTIONS[symmetry][action], float(value))
+
+    def write(self, path: str | Path, meta: Dict | None = None) -> Path:
+        """Write the book files for ``path`` (see ``Book``); ``meta`` goes to the sidecar."""
+        path = Path(path).with_suffix(".npy")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys = sorted(self._entries)
+        moves = np.zeros(len(keys), dtype=MOVE_DTYPE)
+        moves["action"] = [self._entries[key][0] for key in keys]
+        moves["value"] = [self._entries[key][1] for key in keys]
+        np.save(path, np.array(keys, dtype=np.uint64))
+        np.save(path.with_suffix(".moves.npy"), moves)
+        meta = dict(meta or {}, entries=len(keys))
+        path.with_suffix(".meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return path
+
+
+class BookAgent:
+    """Plays the book move when the position is in ``book``, otherwise asks ``fallback``.
+
+    ``completed_depth`` reports the book's search depth (from its meta) on
+    hits and the fallback's on misses.
+    """
+
+    def __init__(self, book: Book, fallback) -> None:
+        self.book = book
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+        self.completed_depth = 0
+
+    def choose_action(self, env, stats: SearchStats | None = None) -> int:
+        entry = self.book.lookup(env.packed)
+        if entry is not None:
+            self.hits += 1
+            self.completed_depth = int(self.book.meta.get("depth", 0))
+            return entry[0]
+        self.misses += 1
+        action = self.fallback.choose_action(env, stats)
+        self.completed_depth = self.fallback.completed_depth
+        return action
@@ -1,123 +1,376 @@
 from __future__ import annotations
 
 import random
-from typing import Dict, List, Tuple
+import time
+from typing import Callable, Dict, List, Tuple
 
 import numpy as np
 
-from twenty48.mechanics import slide_and_merge_line
-from twenty48.rules import is_done
+from twenty48.bitboard import (
+    INVERSE_SYMMETRY_ACTIONS,
+    afterstates,
+    canonical,
+    count_empty,
+    distinct_tiles,
+    empty_cells,
+    move,
+    pack_board,
+    tile_sum,
+    unpack_board,
+)
 
-from .heuristics import evaluate
+from .heuristics import evaluate_packed
+from .stats import SearchStats
+from .transposition import TranspositionTable
 
 ActionValue = Tuple[int, float]
+ChanceChild = Tuple[float, int, int, float, int]
+# Maps a packed board to the depth to search it to.
+DepthPolicy = Callable[[int], int]
+# Maps a packed board to its heuristic value.
+Evaluator = Callable[[int], float]
 
+ACTION_ORDER = (3, 2, 0, 1)
+DEFAULT_DEPTH = 3
+MAX_TIMED_DEPTH = 12
+# Max nodes visited between deadline checks in timed search.
+_CLOCK_INTERVAL = 32
 
-def choose_action(env, depth: int, max_cells: int = 4) -> int:
-    """env??????????action(0-3)????"""
-    board = env.board
-    score = int(env.score)
+# Low key bits separating max, chance and heuristic-leaf entries that share a board.
+_MAX = 0
+_CHANCE = 1
+_LEAF = 2
 
-    cache: Dict[Tuple[str, int, Tuple[int, ...], int], float] = {}
-    action_order = [3, 2, 0, 1]
 
-    best_action = 0
-    best_value = float("-inf")
-    for action in action_order:
-        new_board, delta, moved = apply_move(board, action)
-        if not moved:
-            continue
-        value = chance_value(new_board, score + delta, depth - 1, cache, max_cells=max_cells)
-        if value > best_value:
-            best_value = value
-            best_action = action
+class ExpectimaxSearcher:
+    """Expectimax over packed boards that owns a reusable transposition table.
 
-    return best_action
+    Keep one searcher per game (or per worker) so the table survives between
+    moves; pass ``table`` to share or size it explicitly.
 
+    Cached values depend only on the board and the remaining depth. Move
+    rewards are added on top of the cached child values, scaled by
+    ``reward_weight`` (0 ranks moves by the heuristic alone).
 
-def apply_move(board: np.ndarray, action: int) -> Tuple[np.ndarray, int, bool]:
-    oriented, undo = _orient_for_action(board, action)
-    new_oriented = np.zeros_like(oriented)
-    reward = 0
-    for i in range(4):
-        line, line_reward, _ = slide_and_merge_line(oriented[i, :])
-        new_oriented[i, :] = line
-        reward += line_reward
-    new_board = undo(new_oriented)
-    moved = not np.array_equal(board, new_board)
-    return new_board, int(reward), moved
-
-
-def max_value(board: np.ndarray, score: int, depth: int, cache: Dict, max_cells: int = 4) -> float:
-    key = ("max", depth, _board_key(board), score)
-    cached = cache.get(key)
-    if cached is not None:
-        return cached
-
-    if depth == 0 or is_done(board):
-        value = float(evaluate(board, score))
-        cache[key] = value
-        return value
+    Chance nodes either sample ``max_cells`` empty cells, or, when
+    ``min_prob`` is set, expand every empty cell and stop at any spawn whose
+    cumulative path probability falls below ``min_prob`` (or that would put
+    more than ``max_fours`` 4-spawns on the path), scoring it with the
+    heuristic instead. Cached values are shared across paths regardless of
+    their probability.
+
+    With ``time_ms`` the search deepens iteratively from depth 1 up to
+    ``depth`` (default ``MAX_TIMED_DEPTH``), searching the previous
+    iteration's best move first, and returns the deepest completed result
+    when the budget runs out. Subtrees finished before the deadline stay in
+    the table for the next iteration and the next move. ``max_nodes`` bounds
+    the same deepening loop by max nodes visited instead, which keeps results
+    reproducible.
+
+    ``depth_policy`` picks the depth per board (see ``adaptive_depth``); with
+    a budget it is the deepest iteration tried.
+
+    ``evaluator`` replaces the default ``evaluate_packed`` leaf heuristic,
+    e.g. ``NTupleNetwork.state_value`` (which expects ``reward_weight=1``).
+
+    Each ``search`` leaves its counters in ``last_stats``; pass a
+    ``SearchStats`` to ``choose_action`` to accumulate them over many moves.
+
+    With ``symmetry`` every node is searched as the canonical representative
+    of its 8 rotations/reflections, so mirrored positions share table
+    entries; the root move is mapped back to the original orientation.
+    """
+
+    def __init__(
+        self,
+        depth: int | None = None,
+        max_cells: int = 4,
+        table: TranspositionTable | None = None,
+        reward_weight: float = 0.0,
+        min_prob: float | None = None,
+        max_fours: int | None = None,
+        time_ms: float | None = None,
+        symmetry: bool = False,
+        max_nodes: int | None = None,
+        depth_policy: DepthPolicy | None = None,
+        evaluator: Evaluator | None = None,
+    ) -> None:
+        if depth is None:
+            depth = DEFAULT_DEPTH if time_ms is None and max_nodes is None else MAX_TIMED_DEPTH
+        self.depth = int(depth)
+        self.max_cells = int(max_cells)
+        self.table = table if table is not None else TranspositionTable()
+        self.reward_weight = float(reward_weight)
+        self.min_prob = None if min_prob is None else float(min_prob)
+        self.max_fours = None if max_fours is None else int(max_fours)
+        self.time_ms = None if time_ms is None else float(time_ms)
+        self.symmetry = bool(symmetry)
+        self.max_nodes = None if max_nodes is None else int(max_nodes)
+        self.depth_policy = depth_policy
+        self.evaluator = evaluator if evaluator is not None else evaluate_packed
+        self.completed_depth = 0
+        # Node visits (including leaves and cache hits) over the searcher's lifetime.
+        self.nodes = 0
+        self.chance_nodes = 0
+        self.leaf_evals = 0
+        self.pruned = 0
+        self.last_stats = SearchStats()
+        self._depth_times: Dict[int, float] = {}
+        self._deadline: float | None = None
+        self._node_limit: int | None = None
+        self._clock = 0
+
+    def choose_action(self, env, stats: SearchStats | None = None) -> int:
+        action = self.search(pack_board(env.board))[0]
+        if stats is not None:
+            stats.merge(self.last_stats)
+        return action
+
+    def search(self, board: int, depth: int | None = None) -> ActionValue:
+        """Best (action, value) for a packed board; action is 0 when no move is legal."""
+        start = time.perf_counter()
+        nodes, chance_nodes, leaf_evals, pruned = self.nodes, self.chance_nodes, self.leaf_evals, self.pruned
+        hits, misses = self.table.hits, self.table.misses
+        self._depth_times = {}
+        result = self._search(board, depth, start)
+        self.last_stats = SearchStats(
+            searches=1,
+            max_visits=self.nodes - nodes,
+            chance_visits=self.chance_nodes - chance_nodes,
+            leaf_evals=self.leaf_evals - leaf_evals,
+            table_hits=self.table.hits - hits,
+            table_misses=self.table.misses - misses,
+            peak_table_size=len(self.table),
+            pruned=self.pruned - pruned,
+            wall_time=time.perf_counter() - start,
+            depth_times=self._depth_times,
+        )
+        return result
+
+    def _search(self, board: int, depth: int | None, start: float) -> ActionValue:
+        if depth is None:
+            depth = self.depth if self.depth_policy is None else self.depth_policy(board)
+        depth = int(depth)
+        symmetry = 0
+        if self.symmetry:
+            board, symmetry = canonical(board)
+        if self.time_ms is None and self.max_nodes is None:
+            self.completed_depth = depth
+            action, value = self._search_root(board, depth, ACTION_ORDER, {})
+            self._depth_times[depth] = time.perf_counter() - start
+        else:
+            action, value = self._search_deepening(board, depth, start)
+        if value == float("-inf"):
+            return 0, value
+        return INVERSE_SYMMETRY_ACTIONS[symmetry][action], value
+
+    def _search_deepening(self, board: int, max_depth: int, start: float) -> ActionValue:
+        # Depth 1 always completes so there is a move to return.
+        best = self._search_root(board, 1, ACTION_ORDER, {})
+        self.completed_depth = 1
+        self._depth_times[1] = time.perf_counter() - start
+        if bin(afterstates(board)[2]).count("1") <= 1:
+            return best
+
+        if self.time_ms is not None:
+            self._deadline = start + self.time_ms / 1000.0
+        if self.max_nodes is not None:
+            self._node_limit = self.nodes + self.max_nodes
+        try:
+            for depth in range(2, max_depth + 1):
+                order = (best[0],) + tuple(a for a in ACTION_ORDER if a != best[0])
+                values: Dict[int, float] = {}
+                iteration_start = time.perf_counter()
+                try:
+                    best = self._search_root(board, depth, order, values)
+                except _SearchTimeout:
+                    self._depth_times[depth] = time.perf_counter() - iteration_start
+                    # Values at the same depth are comparable; use them once the previous best is re-scored.
+                    if best[0] in values:
+                        action = max(values, key=values.get)
+                        best = (action, values[action])
+                    break
+                self._depth_times[depth] = time.perf_counter() - iteration_start
+                self.completed_depth = depth
+        finally:
+            self._deadline = None
+            self._node_limit = None
+        return best
 
-    best = float("-inf")
-    for action in (3, 2, 0, 1):
-        new_board, delta, moved = apply_move(board, action)
-        if not moved:
-            continue
-        value = chance_value(new_board, score + delta, depth - 1, cache, max_cells=max_cells)
-        if value > best:
-            best = value
+    def _search_root(
+        self, board: int, depth: int, order: Tuple[int, ...], values: Dict[int, float]
+    ) -> ActionValue:
+        boards, rewards, mask = afterstates(board)
+        best_action = 0
+        best_value = float("-inf")
+        for action in order:
+            if not mask >> action & 1:
+                continue
+            value = self.reward_weight * rewards[action] + self.chance_value(boards[action], depth - 1)
+            values[action] = value
+            if value > best_value:
+                best_value = value
+                best_action = action
+        return best_action, best_value
 
-    if best == float("-inf"):
-        best = float(evaluate(board, score))
+    def max_value(self, board: int, depth: int, prob: float = 1.0, fours: int = 0) -> float:
+        self.nodes += 1
+        if self._node_limit is not None and self.nodes > self._node_limit:
+            raise _SearchTimeout
+        if self._deadline is not None:
+            self._clock += 1
+            if self._clock >= _CLOCK_INTERVAL:
+                self._clock = 0
+                if time.perf_counter() > self._deadline:
+                    raise _SearchTimeout
 
-    cache[key] = best
-    return best
+        if depth == 0:
+            return self.leaf_value(board)
 
+        if self.symmetry:
+            board = canonical(board)[0]
+        key = (board << 2) | _MAX
+        cached = self.table.get(key, depth)
+        if cached is not None:
+            return cached
 
-def chance_value(board: np.ndarray, score: int, depth: int, cache: Dict, max_cells: int = 4) -> float:
-    key = ("chance", depth, _board_key(board), score)
-    cached = cache.get(key)
-    if cached is not None:
-        return cached
+        boards, rewards, mask = afterstates(board)
+        best = float("-inf")
+        for action in ACTION_ORDER:
+            if not mask >> action & 1:
+                continue
+            value = self.reward_weight * rewards[action] + self.chance_value(boards[action], depth - 1, prob, fours)
+            if value > best:
+                best = value
 
-    empties = list(zip(*np.where(board == 0)))
-    if not empties:
-        value = max_value(board, score, depth, cache, max_cells=max_cells)
-        cache[key] = value
+        if best == float("-inf"):
+            best = self.leaf_value(board)
+
+        self.table.put(key, depth, best)
+        return best
+
+    def chance_value(self, board: int, depth: int, prob: float = 1.0, fours: int = 0) -> float:
+        self.chance_nodes += 1
+        if self.symmetry:
+            board = canonical(board)[0]
+        key = (board << 2) | _CHANCE
+        cached = self.table.get(key, depth)
+        if cached is not None:
+            return cached
+
+        value = 0.0
+        for weight, child, child_depth, child_prob, child_fours in self.chance_children(board, depth, prob, fours):
+            value += weight * self.max_value(child, child_depth, child_prob, child_fours)
+        self.table.put(key, depth, value)
         return value
 
-    if len(empties) > max_cells:
-        rng = random.Random(_sample_seed(board, score, depth))
-        empties = rng.sample(empties, k=max_cells)
+    def leaf_value(self, board: int) -> float:
+        """Heuristic value of a board, cached separately from searched values."""
+        if self.symmetry:
+            board = canonical(board)[0]
+        key = (board << 2) | _LEAF
+        value = self.table.get(key, 0)
+        if value is None:
+            self.leaf_evals += 1
+            value = self.evaluator(board)
+            self.table.put(key, 0, value)
+        return value
 
-    total = 0.0
-    for r, c in empties:
-        for value, prob in ((2, 0.9), (4, 0.1)):
-            next_board = board.copy()
-            next_board[r, c] = value
-            total += prob * max_value(next_board, score, depth, cache, max_cells=max_cells)
+    def chance_children(self, board: int, depth: int, prob: float = 1.0, fours: int = 0) -> List[ChanceChild]:
+        """Weighted max-node children of a chance node as (weight, board, depth, prob, fours).
 
-    value = total / len(empties)
-    cache[key] = value
-    return value
+        Pruned spawns are returned with depth 0, i.e. scored by the heuristic.
+        """
+        empties = empty_cells(board)
+        if not empties:
+            return [(1.0, board, depth, prob, fours)]
 
+        if self.min_prob is None:
+            if len(empties) > self.max_cells:
+                rng = random.Random(_sample_seed(board, depth))
+                empties = rng.sample(empties, k=self.max_cells)
+            weight = 1.0 / len(empties)
+            children = []
+            for cell in empties:
+                shift = 4 * cell
+                children.append((0.9 * weight, board | (1 << shift), depth, prob, fours))
+                children.append((0.1 * weight, board | (2 << shift), depth, prob, fours))
+            return children
 
-def _board_key(board: np.ndarray) -> Tuple[int, ...]:
-    return tuple(int(x) for x in board.reshape(-1))
+        weight = 1.0 / len(empties)
+        prob_two = prob * weight * 0.9
+        prob_four = prob * weight * 0.1
+        depth_two = depth if prob_two >= self.min_prob else 0
+        expand_four = prob_four >= self.min_prob and (self.max_fours is None or fours < self.max_fours)
+        depth_four = depth if expand_four else 0
+        if depth:
+            self.pruned += len(empties) * ((depth_two == 0) + (depth_four == 0))
+        children = []
+        for cell in empties:
+            shift = 4 * cell
+            children.append((0.9 * weight, board | (1 << shift), depth_two, prob_two, fours))
+            children.append((0.1 * weight, board | (2 << shift), depth_four, prob_four, fours + 1))
+        return children
+
+
+def choose_action(
+    env,
+    depth: int | None = None,
+    max_cells: int = 4,
+    table: TranspositionTable | None = None,
+    reward_weight: float = 0.0,
+    min_prob: float | None = None,
+    max_fours: int | None = None,
+    time_ms: float | None = None,
+    symmetry: bool = False,
+    max_nodes: int | None = None,
+    depth_policy: DepthPolicy | None = None,
+    stats: SearchStats | None = None,
+    evaluator: Evaluator | None = None,
+) -> int:
+    """env??????????action(0-3)????"""
+    searcher = ExpectimaxSearcher(
+        depth=depth,
+        max_cells=max_cells,
+        table=table,
+        reward_weight=reward_weight,
+        min_prob=min_prob,
+        max_fours=max_fours,
+        time_ms=time_ms,
+        symmetry=symmetry,
+        max_nodes=max_nodes,
+        depth_policy=depth_policy,
+        evaluator=evaluator,
+    )
+    return searcher.choose_action(env, stats)
 
 
-def _sample_seed(board: np.ndarray, score: int, depth: int) -> int:
-    return int((score + depth * 1315423911 + int(board.sum())) & 0xFFFFFFFF)
+def adaptive_depth(board: int, max_depth: int = DEFAULT_DEPTH + 2, min_depth: int = 2) -> int:
+    """Search depth from board complexity, clamped to [min_depth, max_depth].
+
+    Starts from distinct tiles - 2: boards with few tile values are simple
+    and cheap to get right. Open boards (8+ empty cells) branch widely and
+    rarely need deep search, so they get one ply less; nearly full boards
+    (2 or fewer empty cells) are where games are lost and get one ply more.
+    """
+    depth = distinct_tiles(board) - 2
+    empty = count_empty(board)
+    if empty >= 8:
+        depth -= 1
+    elif empty <= 2:
+        depth += 1
+    return max(min_depth, min(max_depth, depth))
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+def apply_move(board: np.ndarray, action: int) -> Tuple[np.ndarray, int, bool]:
+    packed = pack_board(board)
+    new_packed, reward = move(packed, action)
+    return unpack_board(new_packed), int(reward), new_packed != packed
 
 
-def _orient_for_action(board: np.ndarray, action: int):
-    if action == 3:
-        return board.copy(), lambda b: b
-    if action == 1:
-        return np.fliplr(board).copy(), np.fliplr
-    if action == 0:
-        return board.T.copy(), lambda b: b.T
-    if action == 2:
-        return np.fliplr(board.T).copy(), lambda b: np.fliplr(b).T
-    raise ValueError(f"Invalid action: {action}")
+def _sample_seed(board: int, depth: int) -> int:
+    return int((depth * 1315423911 + tile_sum(board)) & 0xFFFFFFFF)
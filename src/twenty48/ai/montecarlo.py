@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from twenty48.bitboard import ACTIONS, afterstates, afterstates_batch, legal_actions_batch, move_batch, pack_board
+from twenty48.vec_env import spawn_tiles
+
+from .expectimax import ACTION_ORDER, ActionValue
+
+ROLLOUT_POLICIES = ("random", "greedy")
+
+# _NTH_ACTION[mask, i]: the i-th legal action of a legal-move mask.
+_NTH_ACTION = np.zeros((16, 4), dtype=np.int64)
+for _mask in range(16):
+    for _i, _action in enumerate(a for a in ACTIONS if _mask >> a & 1):
+        _NTH_ACTION[_mask, _i] = _action
+_LEGAL_COUNT = np.array([bin(mask).count("1") for mask in range(16)], dtype=np.int64)
+
+# (afterstates, horizon, policy, seed) of one rollout chunk.
+Chunk = Tuple[np.ndarray, int, str, np.random.SeedSequence]
+
+
+def rollout_returns(boards: np.ndarray, horizon: int, rng: np.random.Generator, policy: str = "random") -> np.ndarray:
+    """Summed move rewards of one rollout from each afterstate, advanced together.
+
+    Each board first gets its spawn, then plays up to ``horizon`` moves with
+    a uniformly random legal action (``"random"``) or the highest immediate
+    reward with random tie-breaks (``"greedy"``). Finished games stop scoring.
+    """
+    if policy not in ROLLOUT_POLICIES:
+        raise ValueError(f"Unknown rollout policy: {policy}")
+    boards = spawn_tiles(np.asarray(boards, dtype=np.uint64), rng)
+    returns = np.zeros(boards.shape[0], dtype=np.float64)
+    alive = np.ones(boards.shape[0], dtype=np.bool_)
+    for _ in range(horizon):
+        masks = legal_actions_batch(boards)
+        alive &= masks != 0
+        if not np.any(alive):
+            break
+        if policy == "random":
+            picks = (rng.random(boards.shape[0]) * _LEGAL_COUNT[masks]).astype(np.int64)
+            actions = _NTH_ACTION[masks, picks]
+        else:
+            _, rewards, moved = afterstates_batch(boards)
+            scores = np.where(moved, rewards + rng.random(rewards.shape), -1.0)
+            actions = np.argmax(scores, axis=1)
+        moved_boards, rewards = move_batch(boards, actions)
+        returns += np.where(alive, rewards, 0)
+        boards = np.where(alive, spawn_tiles(moved_boards, rng), boards)
+    return returns
+
+
+def _run_chunk(chunk: Chunk) -> np.ndarray:
+    boards, horizon, policy, seed = chunk
+    return rollout_returns(boards, horizon, np.random.default_rng(seed), policy)
+
+
+class MonteCarloAgent:
+    """Picks the legal move with the best mean return over batched random rollouts.
+
+    Every decision runs ``rollouts`` rollouts of ``horizon`` moves per legal
+    move, all advanced together as one packed-board array. Rollouts are cut
+    into chunks of ``chunk_size`` boards with their own seeds (spawned from
+    ``seed``), so results do not depend on ``workers``; with ``workers > 1``
+    chunks run on a persistent process pool.
+    """
+
+    def __init__(
+        self,
+        rollouts: int = 100,
+        horizon: int = 20,
+        policy: str = "random",
+        seed: int | None = None,
+        workers: int = 1,
+        chunk_size: int = 1024,
+    ) -> None:
+        if policy not in ROLLOUT_POLICIES:
+            raise ValueError(f"Unknown rollout policy: {policy}")
+        self.rollouts = int(rollouts)
+        self.horizon = int(horizon)
+        self.policy = policy
+        self.chunk_size = int(chunk_size)
+        self.workers = int(workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self.reset(seed)
+
+    def reset(self, seed: int | None = None) -> None:
+        """Restart the rollout seed stream (e.g. at the start of each game)."""
+        self._seeds = np.random.SeedSequence(seed)
+
+    def choose_action(self, env) -> int:
+        return self.search(pack_board(env.board))[0]
+
+    def search(self, board: int) -> ActionValue:
+        """Best (action, mean return); action is 0 when no move is legal."""
+        boards, rewards, mask = afterstates(board)
+        legal = [action for action in ACTIONS if mask >> action & 1]
+        if not legal:
+            return 0, float("-inf")
+
+        starts = np.repeat(np.array([boards[action] for action in legal], dtype=np.uint64), self.rollouts)
+        pieces = np.array_split(starts, max(1, -(-starts.size // self.chunk_size)))
+        seeds = self._seeds.spawn(1)[0].spawn(len(pieces))
+        chunks: List[Chunk] = [(piece, self.horizon, self.policy, s) for piece, s in zip(pieces, seeds)]
+        if self._executor is None:
+            returns = [_run_chunk(chunk) for chunk in chunks]
+        else:
+            returns = list(self._executor.map(_run_chunk, chunks))
+        means = np.concatenate(returns).reshape(len(legal), self.rollouts).mean(axis=1)
+
+        values = {action: rewards[action] + float(mean) for action, mean in zip(legal, means)}
+        best_action = 0
+        best_value = float("-inf")
+        for action in ACTION_ORDER:
+            if action in values and values[action] > best_value:
+                best_value = values[action]
+                best_action = action
+        return best_action, best_value
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "MonteCarloAgent":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from twenty48.bitboard import ACTIONS, afterstates, board_exponents, move, symmetries
+from twenty48.env import Twenty48Env
+
+from .expectimax import ActionValue
+
+Pattern = Tuple[int, ...]
+
+# Two straight lines and three 2x2 squares: 5 * 16**4 weights, a few MB.
+PATTERNS_4: Tuple[Pattern, ...] = ((0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 4, 5), (1, 2, 5, 6), (5, 6, 9, 10))
+# The 4 six-tuples of Yeh et al.: 4 * 16**6 weights (about 270 MB as float32).
+PATTERNS_6: Tuple[Pattern, ...] = ((0, 1, 2, 3, 4, 5), (4, 5, 6, 7, 8, 9), (0, 1, 2, 4, 5, 6), (4, 5, 6, 8, 9, 10))
+DEFAULT_PATTERNS = PATTERNS_4
+
+
+def _symmetry_cells() -> np.ndarray:
+    """(8, 16) source cell of every cell in each dihedral image, ordered like ``symmetries``."""
+    identity = sum(cell << (4 * cell) for cell in range(16))
+    return np.array([[(image >> (4 * cell)) & 0xF for cell in range(16)] for image in symmetries(identity)])
+
+
+class NTupleNetwork:
+    """Afterstate value function: a sum of n-tuple weights over the 8 board symmetries.
+
+    Each pattern is a tuple of cell indices (4 * row + col); the exponents
+    under it index that pattern's slice of one flat float32 ``weights``
+    array. Every pattern is applied to all 8 rotations/reflections of the
+    board, so values are symmetric and each weight is shared.
+
+    Feature indices are computed with numpy from precomputed (symmetry,
+    pattern) cell tables, for one board or a whole array of boards at once.
+    """
+
+    def __init__(self, patterns: Sequence[Sequence[int]] = DEFAULT_PATTERNS, weights: np.ndarray | None = None) -> None:
+        self.patterns: Tuple[Pattern, ...] = tuple(tuple(int(cell) for cell in pattern) for pattern in patterns)
+        sizes = [16 ** len(pattern) for pattern in self.patterns]
+        self.offsets = tuple(int(offset) for offset in np.cumsum([0] + sizes[:-1]))
+        if weights is None:
+            weights = np.zeros(sum(sizes), dtype=np.float32)
+        if weights.shape != (sum(sizes),):
+            raise ValueError(f"Expected {sum(sizes)} weights, got shape {weights.shape}")
+        self.weights = weights
+
+        # Pattern cells in every symmetry image, padded with cell 16 (always exponent 0).
+        width = max(len(pattern) for pattern in self.patterns)
+        cells = np.full((len(self.patterns), width), 16, dtype=np.intp)
+        for i, pattern in enumerate(self.patterns):
+            cells[i, : len(pattern)] = pattern
+        sources = np.concatenate([_symmetry_cells(), np.full((8, 1), 16)], axis=1)
+        self._cells = sources[:, cells].reshape(8 * len(self.patterns), width)
+        self._shifts = 4 * np.arange(width, dtype=np.int64)
+        self._offsets = np.tile(np.array(self.offsets, dtype=np.int64), 8)
+
+    def features(self, packed: int) -> List[int]:
+        """Weight indices active for a board (patterns x symmetries)."""
+        return self.features_batch(np.array([packed], dtype=np.uint64))[0].tolist()
+
+    def features_batch(self, packed: np.ndarray) -> np.ndarray:
+        """(N, 8 * patterns) int64 weight indices for an array of packed boards."""
+        cells = board_exponents(packed)
+        exponents = np.zeros((cells.shape[0], 17), dtype=np.int64)
+        exponents[:, :16] = cells
+        return (exponents[:, self._cells] << self._shifts).sum(axis=2) + self._offsets
+
+    def value(self, packed: int) -> float:
+        return float(self.values(np.array([packed], dtype=np.uint64))[0])
+
+    def values(self, packed: np.ndarray) -> np.ndarray:
+        """(N,) values for an array of packed boards, summed in float64."""
+        return self.weights[self.features_batch(packed)].sum(axis=1, dtype=np.float64)
+
+    def update(self, packed: int, error: float, learning_rate: float) -> None:
+        """Move ``value(packed)`` a ``learning_rate`` fraction of ``error``, spread over its features."""
+        indices = self.features_batch(np.array([packed], dtype=np.uint64))[0]
+        np.add.at(self.weights, indices, learning_rate * error / len(indices))
+
+    def best_action(self, packed: int) -> ActionValue:
+        """Greedy (action, reward + afterstate value); action is 0 when no move is legal."""
+        boards, rewards, mask = afterstates(packed)
+        legal = [action for action in ACTIONS if mask >> action & 1]
+        if not legal:
+            return 0, float("-inf")
+        values = self.values(np.array([boards[action] for action in legal], dtype=np.uint64)).tolist()
+        best_action = 0
+        best_value = float("-inf")
+        for action, value in zip(legal, values):
+            value = rewards[action] + value
+            if value > best_value:
+                best_value = value
+                best_action = action
+        return best_action, best_value
+
+    def state_value(self, packed: int) -> float:
+        """Expected future score of a board before moving (0 when the game is over).
+
+        Usable as an expectimax leaf evaluator together with ``reward_weight=1``.
+        """
+        value = self.best_action(packed)[1]
+        return 0.0 if value == float("-inf") else value
+
+    def choose_action(self, env) -> int:
+        return self.best_action(env.packed)[0]
+
+    def save(self, path: str | Path) -> Path:
+        """Write weights to ``path`` (.npy) and the patterns to a ``.meta.json`` sidecar."""
+        path = Path(path).with_suffix(".npy")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+        meta = {"patterns": [list(pattern) for pattern in self.patterns]}
+        path.with_suffix(".meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path, mmap_mode: str | None = "r") -> "NTupleNetwork":
+        """Load saved weights, memory-mapped read-only by default (use None or "c" to train)."""
+        path = Path(path).with_suffix(".npy")
+        meta = json.loads(path.with_suffix(".meta.json").read_text(encoding="utf-8"))
+        return cls(meta["patterns"], np.load(path, mmap_mode=mmap_mode))
+
+
+def train_td(
+    network: NTupleNetwork,
+    episodes: int,
+    learning_rate: float = 0.1,
+    lam: float = 0.0,
+    seed: int | None = None,
+    callback: Callable[[int, int], None] | None = None,
+) -> List[int]:
+    """Train on greedy self-play in ``Twenty48Env``; returns the final score of each episode.
+
+    With ``lam == 0`` this is online TD(0) on afterstates: after each move
+    V(s'_t) moves toward r_{t+1} + V(s'_{t+1}). With ``lam > 0`` the
+    afterstates of an episode are updated backwards at its end toward their
+    lambda-returns. Episode ``i`` is seeded with ``seed + i``. ``callback``
+    receives (episode, score) after each episode.
+    """
+    env = Twenty48Env()
+    scores = []
+    for episode in range(episodes):
+        env.reset(seed=None if seed is None else seed + episode)
+        board = env.packed
+        action = network.best_action(board)[0]
+        # (afterstate, reward of the next move, value of the next afterstate) per move.
+        trace: List[Tuple[int, int, float]] = []
+        done = False
+        while not done:
+            after_state = move(board, action)[0]
+            board, _, done = env.step_fast(action)
+            action, target = network.best_action(board)
+            reward, next_value = 0, 0.0
+            if not done:
+                reward = move(board, action)[1]
+                next_value = target - reward
+            if lam == 0.0:
+                network.update(after_state, reward + next_value - network.value(after_state), learning_rate)
+            else:
+                trace.append((after_state, reward, next_value))
+
+        ret = 0.0
+        for after_state, reward, next_value in reversed(trace):
+            ret = reward + (1.0 - lam) * next_value + lam * ret
+            network.update(after_state, ret - network.value(after_state), learning_rate)
+
+        scores.append(int(env.score))
+        if callback is not None:
+            callback(episode, int(env.score))
+    return scores
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from twenty48.bitboard import INVERSE_SYMMETRY_ACTIONS, afterstates, canonical, pack_board
+
+from .expectimax import ACTION_ORDER, ActionValue, DepthPolicy, ExpectimaxSearcher
+from .stats import SearchStats
+from .transposition import TranspositionTable
+
+# (board, depth, prob, fours) of a max node solved by a worker.
+Task = Tuple[int, int, float, int]
+
+# Per-process searcher whose table persists across searches; set by _init_worker.
+_worker_searcher: ExpectimaxSearcher | None = None
+
+
+def _init_worker(config: Dict) -> None:
+    global _worker_searcher
+    config = dict(config)
+    table = TranspositionTable(config.pop("table_entries"))
+    _worker_searcher = ExpectimaxSearcher(table=table, **config)
+
+
+def _solve(tasks: List[Task]) -> Tuple[List[float], SearchStats]:
+    """Solve one search's block of tasks in order on a freshly cleared worker table."""
+    searcher = _worker_searcher
+    table = searcher.table
+    table.clear()
+    table.reset_stats()
+    searcher.nodes = searcher.chance_nodes = searcher.leaf_evals = searcher.pruned = 0
+    values = [searcher.max_value(board, depth, prob, fours) for board, depth, prob, fours in tasks]
+    stats = SearchStats(
+        max_visits=searcher.nodes,
+        chance_visits=searcher.chance_nodes,
+        leaf_evals=searcher.leaf_evals,
+        table_hits=table.hits,
+        table_misses=table.misses,
+        peak_table_size=len(table),
+        pruned=searcher.pruned,
+    )
+    return values, stats
+
+
+class ParallelExpectimax:
+    """Root-parallel expectimax on a persistent process pool.
+
+    The spawns under each legal root move (the first ply of chance nodes)
+    become packed-board tasks, one block per move, scheduled on the pool.
+    Each worker keeps one transposition table that it clears at the start of
+    a block, so sibling spawns share cached subtrees as in the serial
+    search. A block's values depend only on its tasks and the blocks do not
+    depend on the pool, so results are identical for any number of workers.
+    At most one worker per legal move (4) is busy. ``last_stats`` sums the
+    workers' counters; its peak table size is the largest block's.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        depth: int = 3,
+        max_cells: int = 4,
+        reward_weight: float = 0.0,
+        min_prob: float | None = None,
+        max_fours: int | None = None,
+        table_entries: int | None = None,
+        symmetry: bool = False,
+        depth_policy: DepthPolicy | None = None,
+    ) -> None:
+        config = {
+            "depth": int(depth),
+            "max_cells": int(max_cells),
+            "reward_weight": float(reward_weight),
+            "min_prob": min_prob,
+            "max_fours": max_fours,
+            "table_entries": table_entries,
+            "symmetry": bool(symmetry),
+        }
+        self.searcher = ExpectimaxSearcher(
+            depth=depth,
+            max_cells=max_cells,
+            table=TranspositionTable(table_entries),
+            reward_weight=reward_weight,
+            min_prob=min_prob,
+            max_fours=max_fours,
+            symmetry=symmetry,
+        )
+        self.depth_policy = depth_policy
+        self.completed_depth = 0
+        self.last_stats = SearchStats()
+        self.workers = int(workers) if workers else (os.cpu_count() or 1)
+        # Blocks are per legal root move, so more than 4 processes would sit idle.
+        self._executor = ProcessPoolExecutor(
+            max_workers=min(self.workers, len(ACTION_ORDER)), initializer=_init_worker, initargs=(config,)
+        )
+
+    def choose_action(self, env, stats: SearchStats | None = None) -> int:
+        action = self.search(pack_board(env.board))[0]
+        if stats is not None:
+            stats.merge(self.last_stats)
+        return action
+
+    def search(self, board: int) -> ActionValue:
+        start = time.perf_counter()
+        depth = self.searcher.depth if self.depth_policy is None else int(self.depth_policy(board))
+        self.completed_depth = depth
+        if depth <= 1:
+            result = self.searcher.search(board, depth)
+            self.last_stats = self.searcher.last_stats
+            return result
+
+        symmetry = 0
+        if self.searcher.symmetry:
+            board, symmetry = canonical(board)
+        boards, rewards, mask = afterstates(board)
+        blocks: List[List[Task]] = []
+        plan: List[Tuple[int, float, int]] = []
+        index = 0
+        for action in ACTION_ORDER:
+            if not mask >> action & 1:
+                continue
+            afterstate = canonical(boards[action])[0] if self.searcher.symmetry else boards[action]
+            block = []
+            for weight, child, child_depth, prob, fours in self.searcher.chance_children(afterstate, depth - 1):
+                plan.append((action, weight, index))
+                block.append((child, child_depth, prob, fours))
+                index += 1
+            blocks.append(block)
+
+        self.last_stats = SearchStats(searches=1, chance_visits=len(blocks))
+        if not blocks:
+            return 0, float("-inf")
+
+        values: List[float] = []
+        for block_values, stats in self._executor.map(_solve, blocks):
+            values.extend(block_values)
+            self.last_stats.merge(stats)
+        self.last_stats.wall_time = time.perf_counter() - start
+        self.last_stats.depth_times[depth] = self.last_stats.wall_time
+        totals: Dict[int, float] = {}
+        for action, weight, index in plan:
+            totals[action] = totals.get(action, 0.0) + weight * values[index]
+
+        best_action = 0
+        best_value = float("-inf")
+        for action in ACTION_ORDER:
+            if action not in totals:
+                continue
+            value = self.searcher.reward_weight * rewards[action] + totals[action]
+            if value > best_value:
+                best_value = value
+                best_action = action
+        return INVERSE_SYMMETRY_ACTIONS[symmetry][best_action], best_value
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ParallelExpectimax":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
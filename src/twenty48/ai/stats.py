@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict
+
+
+@dataclass
+class SearchStats:
+    """Counters for one or more searches; ``merge`` accumulates them.
+
+    ``max_visits``/``chance_visits`` count node visits including table hits,
+    ``leaf_evals`` counts heuristic evaluations actually computed and
+    ``pruned`` counts spawns cut off by ``min_prob``/``max_fours``.
+    ``depth_times`` holds seconds spent per iterative-deepening depth.
+    """
+
+    searches: int = 0
+    max_visits: int = 0
+    chance_visits: int = 0
+    leaf_evals: int = 0
+    table_hits: int = 0
+    table_misses: int = 0
+    peak_table_size: int = 0
+    pruned: int = 0
+    wall_time: float = 0.0
+    depth_times: Dict[int, float] = field(default_factory=dict)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.table_hits + self.table_misses
+        return self.table_hits / total if total else 0.0
+
+    def merge(self, other: "SearchStats") -> "SearchStats":
+        self.searches += other.searches
+        self.max_visits += other.max_visits
+        self.chance_visits += other.chance_visits
+        self.leaf_evals += other.leaf_evals
+        self.table_hits += other.table_hits
+        self.table_misses += other.table_misses
+        self.peak_table_size = max(self.peak_table_size, other.peak_table_size)
+        self.pruned += other.pruned
+        self.wall_time += other.wall_time
+        for depth, seconds in other.depth_times.items():
+            self.depth_times[depth] = self.depth_times.get(depth, 0.0) + seconds
+        return self
+
+    def as_dict(self) -> dict:
+        """JSON-friendly dict with derived per-search averages."""
+        data = asdict(self)
+        data["depth_times"] = {str(depth): seconds for depth, seconds in sorted(self.depth_times.items())}
+        data["hit_rate"] = self.hit_rate
+        searches = max(1, self.searches)
+        data["visits_per_search"] = (self.max_visits + self.chance_visits) / searches
+        data["ms_per_search"] = 1000.0 * self.wall_time / searches
+        return data
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+# Rough per-entry footprint (key, (depth, value) tuple, OrderedDict links) used for byte budgets.
+ENTRY_BYTES = 200
+DEFAULT_MAX_ENTRIES = 1 << 20
+
+
+class TranspositionTable:
+    """Bounded, depth-aware cache of search values with LRU eviction.
+
+    An entry stores the depth it was searched to; a lookup hits when the
+    stored depth is at least the requested one. The table can be kept across
+    calls (e.g. for a whole game) so later searches reuse earlier work.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None) -> None:
+        if max_entries is None:
+            max_entries = max_bytes // ENTRY_BYTES if max_bytes is not None else DEFAULT_MAX_ENTRIES
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive: {max_entries}")
+        self.max_entries = int(max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, depth: int) -> float | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] >= depth:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, depth: int, value: float) -> None:
+        entries = self._entries
+        existing = entries.get(key)
+        if existing is not None and existing[0] > depth:
+            return
+        entries[key] = (depth, value)
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from twenty48.env import Twenty48Env
+
+from .expectimax import ExpectimaxSearcher
+from .heuristics import DEFAULT_WEIGHTS, TableEvaluator
+from .transposition import TranspositionTable
+
+# Weights tuned by default: the evaluator terms, including the opt-in merge bonus.
+WEIGHT_NAMES: Tuple[str, ...] = tuple(DEFAULT_WEIGHTS) + ("merges",)
+
+# (weights, seed, depth, max_steps) of one evaluation game.
+GameTask = Tuple[Dict[str, float], int, int, int]
+
+
+def play_game(weights: Dict[str, float], seed: int, depth: int = 2, max_steps: int = 2000) -> int:
+    """Final score of one seeded expectimax game evaluated with ``weights``."""
+    env = Twenty48Env()
+    env.reset(seed=seed)
+    searcher = ExpectimaxSearcher(depth=depth, table=TranspositionTable(), evaluator=TableEvaluator(weights))
+    for _ in range(max_steps):
+        _, _, done = env.step_fast(searcher.choose_action(env))
+        if done:
+            break
+    return int(env.score)
+
+
+def _play(task: GameTask) -> int:
+    return play_game(*task)
+
+
+def race(scores: np.ndarray, alive: np.ndarray, keep: int, z: float) -> np.ndarray:
+    """Drop candidates that are clearly worse than the ``keep``-th best survivor.
+
+    ``scores`` is (candidates, games) played on common seeds, so each
+    candidate is compared with the reference through its per-seed score
+    differences: it is eliminated when the mean difference plus ``z``
+    standard errors is still below zero. Returns the new ``alive`` mask.
+    """
+    alive = alive.copy()
+    survivors = np.flatnonzero(alive)
+    games = scores.shape[1]
+    if games < 2 or survivors.size <= keep:
+        return alive
+    means = scores[survivors].mean(axis=1)
+    reference = survivors[np.argsort(-means, kind="stable")[keep - 1]]
+    for candidate in survivors:
+        diffs = scores[candidate] - scores[reference]
+        bound = diffs.mean() + z * diffs.std(ddof=1) / np.sqrt(games)
+        if bound < 0:
+            alive[candidate] = False
+    return alive
+
+
+class CrossEntropyTuner:
+    """Cross-entropy search over heuristic weights, scored by expectimax self-play.
+
+    Each generation samples ``population`` weight vectors from a diagonal
+    Gaussian, plays every one on the same ``games`` seeds (common random
+    numbers) and refits the Gaussian to the ``elite_frac`` best by mean
+    score. Games are played in ``race_rounds`` rounds; after each round
+    ``race`` drops candidates that clearly cannot make the elite. Games run
+    on a process pool when ``workers > 1``. With ``checkpoint`` set the
+    state is written after every generation and restored on construction.
+    """
+
+    def __init__(
+        self,
+        mean: Dict[str, float] | None = None,
+        std: float | Dict[str, float] = 1.0,
+        names: Sequence[str] = WEIGHT_NAMES,
+        population: int = 16,
+        elite_frac: float = 0.25,
+        games: int = 8,
+        race_rounds: int = 2,
+        race_z: float = 2.0,
+        depth: int = 2,
+        max_steps: int = 2000,
+        extra_std: float = 0.05,
+        seed: int | None = None,
+        workers: int = 1,
+        checkpoint: str | Path | None = None,
+    ) -> None:
+        self.names = tuple(names)
+        start = dict(DEFAULT_WEIGHTS) if mean is None else dict(mean)
+        self.mean = np.array([start.get(name, 0.0) for name in self.names], dtype=np.float64)
+        if isinstance(std, dict):
+            self.std = np.array([std.get(name, 1.0) for name in self.names], dtype=np.float64)
+        else:
+            self.std = np.full(len(self.names), float(std))
+        self.population = int(population)
+        self.elites = max(1, int(round(self.population * elite_frac)))
+        self.games = int(games)
+        self.race_rounds = max(1, int(race_rounds))
+        self.race_z = float(race_z)
+        self.depth = int(depth)
+        self.max_steps = int(max_steps)
+        self.extra_std = float(extra_std)
+        self.generation = 0
+        self.history: List[Dict] = []
+        self.best: Dict | None = None
+        self.rng = np.random.default_rng(seed)
+        self.workers = int(workers)
+        self.checkpoint = None if checkpoint is None else Path(checkpoint)
+        if self.checkpoint is not None and self.checkpoint.exists():
+            self._load(self.checkpoint)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def weights(self, vector: np.ndarray) -> Dict[str, float]:
+        return {name: float(value) for name, value in zip(self.names, vector)}
+
+    def step(self) -> Dict:
+        """Run one generation and return its history entry."""
+        candidates = self.mean + self.std * self.rng.standard_normal((self.population, len(self.names)))
+        seeds = self.rng.integers(0, 2**31 - 1, size=self.games)
+        scores = np.zeros((self.population, self.games), dtype=np.float64)
+        alive = np.ones(self.population, dtype=np.bool_)
+        played = 0
+        games_played = 0
+        for round_seeds in np.array_split(seeds, min(self.race_rounds, self.games)):
+            survivors = np.flatnonzero(alive)
+            tasks: List[GameTask] = [
+                (self.weights(candidates[i]), int(seed), self.depth, self.max_steps)
+                for i in survivors
+                for seed in round_seeds
+            ]
+            games_played += len(tasks)
+            results = np.array(self._map(tasks), dtype=np.float64).reshape(survivors.size, round_seeds.size)
+            scores[survivors, played : played + round_seeds.size] = results
+            played += round_seeds.size
+            if played < self.games:
+                alive = race(scores[:, :played], alive, self.elites, self.race_z)
+
+        survivors = np.flatnonzero(alive)
+        means = scores[survivors].mean(axis=1)
+        order = survivors[np.argsort(-means, kind="stable")]
+        elite = candidates[order[: self.elites]]
+        self.mean = elite.mean(axis=0)
+        self.std = elite.std(axis=0) + self.extra_std
+        self.generation += 1
+
+        top = int(order[0])
+        entry = {
+            "generation": self.generation,
+            "best_score": float(scores[top].mean()),
+            "best_weights": self.weights(candidates[top]),
+            "elite_score": float(scores[order[: self.elites]].mean()),
+            "mean_weights": self.weights(self.mean),
+            "eliminated": int(self.population - survivors.size),
+            "games_played": games_played,
+        }
+        self.history.append(entry)
+        if self.best is None or entry["best_score"] > self.best["score"]:
+            self.best = {"score": entry["best_score"], "weights": entry["best_weights"], "generation": self.generation}
+        if self.checkpoint is not None:
+            self._save(self.checkpoint)
+        return entry
+
+    def run(self, generations: int, callback: Callable[[Dict], None] | None = None) -> Dict[str, float]:
+        """Run until ``generations`` generations are done (counting resumed ones); returns the mean weights."""
+        while self.generation < generations:
+            entry = self.step()
+            if callback is not None:
+                callback(entry)
+        return self.weights(self.mean)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "CrossEntropyTuner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _map(self, tasks: List[GameTask]) -> List[int]:
+        if self._executor is None:
+            return [_play(task) for task in tasks]
+        return list(self._executor.map(_play, tasks))
+
+    def _save(self, path: Path) -> None:
+        state = {
+            "names": list(self.names),
+            "generation": self.generation,
+            "mean": self.mean.tolist(),
+            "std": self.std.tolist(),
+            "rng": self.rng.bit_generator.state,
+            "history": self.history,
+            "best": self.best,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _load(self, path: Path) -> None:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if tuple(state["names"]) != self.names:
+            raise ValueError(f"Checkpoint tunes {state['names']}, expected {list(self.names)}")
+        self.generation = int(state["generation"])
+        self.mean = np.array(state["mean"], dtype=np.float64)
+        self.std = np.array(state["std"], dtype=np.float64)
+        self.rng.bit_generator.state = state["rng"]
+        self.history = list(state["history"])
+        self.best = state["best"]
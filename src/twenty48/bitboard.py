@@ -0,0 +1,443 @@
+"""Packed 64-bit board representation with precomputed row move tables.
+
+A board is packed into one integer holding 16 nibbles. Nibble ``4 * r + c``
+(bits ``16 * r + 4 * c`` upward) stores the exponent of the tile at row ``r``,
+column ``c``: 0 for an empty cell, ``k`` for the tile ``2**k``. Exponents are
+capped at 15 (32768); two 32768 tiles do not merge.
+
+Row moves are resolved with 65536-entry lookup tables; columns are handled by
+transposing the packed board.
+"""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+ACTIONS = (0, 1, 2, 3)  # UP, RIGHT, DOWN, LEFT
+MAX_EXPONENT = 15
+
+ROW_MASK = 0xFFFF
+NIBBLE_MASK = 0xF
+
+
+def _slide_exponents(line: List[int]) -> Tuple[List[int], int, List[int]]:
+    """Slide a line of exponents to the left, returning (line, reward, merged tile values)."""
+    tiles = [e for e in line if e != 0]
+    output: List[int] = []
+    merged: List[int] = []
+    i = 0
+    while i < len(tiles):
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < MAX_EXPONENT:
+            output.append(tiles[i] + 1)
+            merged.append(1 << (tiles[i] + 1))
+            i += 2
+        else:
+            output.append(tiles[i])
+            i += 1
+    output.extend([0] * (4 - len(output)))
+    return output, sum(merged), merged
+
+
+def _row_to_line(row: int) -> List[int]:
+    return [(row >> (4 * i)) & NIBBLE_MASK for i in range(4)]
+
+
+def _build_tables():
+    rows = np.arange(65536, dtype=np.int64)
+    lines = (rows[:, None] >> (4 * np.arange(4))) & NIBBLE_MASK
+    order = np.argsort(lines == 0, axis=1, kind="stable")
+    tiles = np.zeros((65536, 8), dtype=np.int64)
+    tiles[:, :4] = np.take_along_axis(lines, order, axis=1)
+
+    index = np.arange(65536)
+    read = np.zeros(65536, dtype=np.int64)
+    left = np.zeros(65536, dtype=np.int64)
+    score_left = np.zeros(65536, dtype=np.int64)
+    for k in range(4):
+        first = tiles[index, read]
+        second = tiles[index, read + 1]
+        merge = (first != 0) & (first == second) & (first < MAX_EXPONENT)
+        value = np.where(merge, first + 1, first)
+        left |= value << (4 * k)
+        score_left += np.where(merge, 1 << value, 0)
+        read += np.where(merge, 2, 1)
+
+    reversed_rows = _reverse_rows(rows)
+    right = _reverse_rows(left[reversed_rows])
+    score_right = score_left[reversed_rows]
+    return left, right, score_left, score_right
+
+
+def _reverse_rows(rows: np.ndarray) -> np.ndarray:
+    return ((rows & 0xF) << 12) | ((rows & 0xF0) << 4) | ((rows >> 4) & 0xF0) | (rows >> 12)
+
+
+def _rows_to_columns(rows: np.ndarray) -> np.ndarray:
+    return (rows & 0xF) | ((rows & 0xF0) << 12) | ((rows & 0xF00) << 24) | ((rows & 0xF000) << 36)
+
+
+_left, _right, _score_left, _score_right = _build_tables()
+
+# NumPy row tables for vectorized callers.
+ROW_LEFT = _left.astype(np.uint16)
+ROW_RIGHT = _right.astype(np.uint16)
+SCORE_LEFT = _score_left
+SCORE_RIGHT = _score_right
+
+# Python lists for scalar lookups, which index faster than NumPy arrays.
+_ROW_LEFT = _left.tolist()
+_ROW_RIGHT = _right.tolist()
+_SCORE_LEFT = _score_left.tolist()
+_SCORE_RIGHT = _score_right.tolist()
+_COL_UP = _rows_to_columns(_left).tolist()
+_COL_DOWN = _rows_to_columns(_right).tolist()
+_COL_UP_ARRAY = _rows_to_columns(_left).astype(np.uint64)
+_COL_DOWN_ARRAY = _rows_to_columns(_right).astype(np.uint64)
+
+# Legal-move bits contributed by a row (LEFT/RIGHT) or a transposed row (UP/DOWN).
+_rows = np.arange(65536, dtype=np.int64)
+ROW_LEGAL_H = (np.where(_left != _rows, 1 << 3, 0) | np.where(_right != _rows, 1 << 1, 0)).astype(np.uint8)
+ROW_LEGAL_V = (np.where(_left != _rows, 1 << 0, 0) | np.where(_right != _rows, 1 << 2, 0)).astype(np.uint8)
+_ROW_LEGAL_H = ROW_LEGAL_H.tolist()
+_ROW_LEGAL_V = ROW_LEGAL_V.tolist()
+_MASK_ACTIONS = tuple(tuple(a for a in ACTIONS if mask >> a & 1) for mask in range(16))
+del _left, _right, _score_left, _score_right, _rows
+
+
+def pack_board(board: np.ndarray) -> int:
+    """Pack a 4x4 board of tile values into a 64-bit integer."""
+    packed = 0
+    for i, value in enumerate(np.asarray(board).reshape(-1).tolist()):
+        if value:
+            exponent = int(value).bit_length() - 1
+            if exponent > MAX_EXPONENT:
+                raise ValueError(f"Tile {value} does not fit in a packed board")
+            packed |= exponent << (4 * i)
+    return packed
+
+
+def unpack_board(packed: int) -> np.ndarray:
+    """Unpack a 64-bit board into a 4x4 int64 array of tile values."""
+    cells = []
+    for i in range(16):
+        exponent = (packed >> (4 * i)) & NIBBLE_MASK
+        cells.append(1 << exponent if exponent else 0)
+    return np.array(cells, dtype=np.int64).reshape(4, 4)
+
+
+def transpose(packed: int) -> int:
+    a1 = packed & 0xF0F00F0FF0F00F0F
+    a2 = packed & 0x0000F0F00000F0F0
+    a3 = packed & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def flip_horizontal(packed: int) -> int:
+    """Mirror left-right (reverse the cells of every row)."""
+    x = ((packed & 0xF0F0F0F0F0F0F0F0) >> 4) | ((packed & 0x0F0F0F0F0F0F0F0F) << 4)
+    return ((x & 0xFF00FF00FF00FF00) >> 8) | ((x & 0x00FF00FF00FF00FF) << 8)
+
+
+def flip_vertical(packed: int) -> int:
+    """Mirror top-bottom (reverse the order of the rows)."""
+    x = ((packed & 0xFFFF0000FFFF0000) >> 16) | ((packed & 0x0000FFFF0000FFFF) << 16)
+    return (x >> 32) | ((x & 0xFFFFFFFF) << 32)
+
+
+def symmetries(packed: int) -> Tuple[int, ...]:
+    """The 8 dihedral images of a board, indexed like ``SYMMETRY_ACTIONS``."""
+    h = flip_horizontal(packed)
+    t = transpose(packed)
+    th = flip_horizontal(t)
+    return (packed, h, flip_vertical(packed), flip_vertical(h), t, th, flip_vertical(t), flip_vertical(th))
+
+
+def canonical(packed: int) -> Tuple[int, int]:
+    """Smallest dihedral image of a board and the index of the symmetry producing it."""
+    images = symmetries(packed)
+    best = min(images)
+    return best, images.index(best)
+
+
+def move_left(packed: int) -> Tuple[int, int]:
+    r0 = packed & ROW_MASK
+    r1 = (packed >> 16) & ROW_MASK
+    r2 = (packed >> 32) & ROW_MASK
+    r3 = packed >> 48
+    board = _ROW_LEFT[r0] | (_ROW_LEFT[r1] << 16) | (_ROW_LEFT[r2] << 32) | (_ROW_LEFT[r3] << 48)
+    return board, _SCORE_LEFT[r0] + _SCORE_LEFT[r1] + _SCORE_LEFT[r2] + _SCORE_LEFT[r3]
+
+
+def move_right(packed: int) -> Tuple[int, int]:
+    r0 = packed & ROW_MASK
+    r1 = (packed >> 16) & ROW_MASK
+    r2 = (packed >> 32) & ROW_MASK
+    r3 = packed >> 48
+    board = _ROW_RIGHT[r0] | (_ROW_RIGHT[r1] << 16) | (_ROW_RIGHT[r2] << 32) | (_ROW_RIGHT[r3] << 48)
+    return board, _SCORE_RIGHT[r0] + _SCORE_RIGHT[r1] + _SCORE_RIGHT[r2] + _SCORE_RIGHT[r3]
+
+
+def move_up(packed: int) -> Tuple[int, int]:
+    t = transpose(packed)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = t >> 48
+    board = _COL_UP[c0] | (_COL_UP[c1] << 4) | (_COL_UP[c2] << 8) | (_COL_UP[c3] << 12)
+    return board, _SCORE_LEFT[c0] + _SCORE_LEFT[c1] + _SCORE_LEFT[c2] + _SCORE_LEFT[c3]
+
+
+def move_down(packed: int) -> Tuple[int, int]:
+    t = transpose(packed)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = t >> 48
+    board = _COL_DOWN[c0] | (_COL_DOWN[c1] << 4) | (_COL_DOWN[c2] << 8) | (_COL_DOWN[c3] << 12)
+    return board, _SCORE_RIGHT[c0] + _SCORE_RIGHT[c1] + _SCORE_RIGHT[c2] + _SCORE_RIGHT[c3]
+
+
+_MOVES = (move_up, move_right, move_down, move_left)
+
+
+def move(packed: int, action: int) -> Tuple[int, int]:
+    """Apply an action (0=UP, 1=RIGHT, 2=DOWN, 3=LEFT); returns (board, reward)."""
+    if action not in ACTIONS:
+        raise ValueError(f"Invalid action: {action}")
+    return _MOVES[action](packed)
+
+
+def afterstates(packed: int) -> Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int], int]:
+    """All four moves at once: (boards, rewards, legal mask), indexed by action.
+
+    Rows and the transposed board are extracted once and shared by the four
+    moves. Bit ``a`` of the mask is set when ``boards[a] != packed``.
+    """
+    r0 = packed & ROW_MASK
+    r1 = (packed >> 16) & ROW_MASK
+    r2 = (packed >> 32) & ROW_MASK
+    r3 = packed >> 48
+    t = transpose(packed)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = t >> 48
+
+    up = _COL_UP[c0] | (_COL_UP[c1] << 4) | (_COL_UP[c2] << 8) | (_COL_UP[c3] << 12)
+    right = _ROW_RIGHT[r0] | (_ROW_RIGHT[r1] << 16) | (_ROW_RIGHT[r2] << 32) | (_ROW_RIGHT[r3] << 48)
+    down = _COL_DOWN[c0] | (_COL_DOWN[c1] << 4) | (_COL_DOWN[c2] << 8) | (_COL_DOWN[c3] << 12)
+    left = _ROW_LEFT[r0] | (_ROW_LEFT[r1] << 16) | (_ROW_LEFT[r2] << 32) | (_ROW_LEFT[r3] << 48)
+    rewards = (
+        _SCORE_LEFT[c0] + _SCORE_LEFT[c1] + _SCORE_LEFT[c2] + _SCORE_LEFT[c3],
+        _SCORE_RIGHT[r0] + _SCORE_RIGHT[r1] + _SCORE_RIGHT[r2] + _SCORE_RIGHT[r3],
+        _SCORE_RIGHT[c0] + _SCORE_RIGHT[c1] + _SCORE_RIGHT[c2] + _SCORE_RIGHT[c3],
+        _SCORE_LEFT[r0] + _SCORE_LEFT[r1] + _SCORE_LEFT[r2] + _SCORE_LEFT[r3],
+    )
+    mask = (up != packed) | ((right != packed) << 1) | ((down != packed) << 2) | ((left != packed) << 3)
+    return (up, right, down, left), rewards, mask
+
+
+def merged_values(packed: int, action: int) -> List[List[int]]:
+    """Tile values created by merges for each line, in the orientation of the move.
+
+    Line ``i`` is row ``i`` for LEFT/RIGHT and column ``i`` for UP/DOWN.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Invalid action: {action}")
+    source = transpose(packed) if action in (0, 2) else packed
+    merged = []
+    for i in range(4):
+        line = _row_to_line((source >> (16 * i)) & ROW_MASK)
+        if action in (1, 2):
+            line.reverse()
+        merged.append(_slide_exponents(line)[2])
+    return merged
+
+
+def legal_actions(packed: int) -> int:
+    """4-bit mask of the actions that change the board; bit ``a`` is set when action ``a`` is legal."""
+    t = transpose(packed)
+    return (
+        _ROW_LEGAL_H[packed & ROW_MASK]
+        | _ROW_LEGAL_H[(packed >> 16) & ROW_MASK]
+        | _ROW_LEGAL_H[(packed >> 32) & ROW_MASK]
+        | _ROW_LEGAL_H[packed >> 48]
+        | _ROW_LEGAL_V[t & ROW_MASK]
+        | _ROW_LEGAL_V[(t >> 16) & ROW_MASK]
+        | _ROW_LEGAL_V[(t >> 32) & ROW_MASK]
+        | _ROW_LEGAL_V[t >> 48]
+    )
+
+
+def actions_from_mask(mask: int) -> Tuple[int, ...]:
+    """Actions set in a legal-move mask, in ascending order."""
+    return _MASK_ACTIONS[mask]
+
+
+def count_empty(packed: int) -> int:
+    x = packed
+    x |= (x >> 2) & 0x3333333333333333
+    x |= x >> 1
+    x = ~x & 0x1111111111111111
+    return bin(x).count("1")
+
+
+def empty_cells(packed: int) -> List[int]:
+    """Indices (4 * row + col, row-major) of the empty cells."""
+    return [i for i in range(16) if not (packed >> (4 * i)) & NIBBLE_MASK]
+
+
+def max_exponent(packed: int) -> int:
+    best = 0
+    while packed:
+        nibble = packed & NIBBLE_MASK
+        if nibble > best:
+            best = nibble
+        packed >>= 4
+    return best
+
+
+def distinct_tiles(packed: int) -> int:
+    """Number of distinct non-empty tile values on the board."""
+    seen = 0
+    while packed:
+        seen |= 1 << (packed & NIBBLE_MASK)
+        packed >>= 4
+    return bin(seen >> 1).count("1")
+
+
+def tile_sum(packed: int) -> int:
+    total = 0
+    while packed:
+        nibble = packed & NIBBLE_MASK
+        if nibble:
+            total += 1 << nibble
+        packed >>= 4
+    return total
+
+
+def _compose(*maps: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Action map of applying ``maps`` right to left, like the board transforms."""
+    result = ACTIONS
+    for mapping in reversed(maps):
+        result = tuple(mapping[a] for a in result)
+    return result
+
+
+_FLIP_H_ACTIONS = (0, 3, 2, 1)
+_FLIP_V_ACTIONS = (2, 1, 0, 3)
+_TRANSPOSE_ACTIONS = (3, 2, 1, 0)
+
+# SYMMETRY_ACTIONS[k][a]: the action on symmetries(board)[k] equivalent to action a on board.
+SYMMETRY_ACTIONS = (
+    ACTIONS,
+    _FLIP_H_ACTIONS,
+    _FLIP_V_ACTIONS,
+    _compose(_FLIP_V_ACTIONS, _FLIP_H_ACTIONS),
+    _TRANSPOSE_ACTIONS,
+    _compose(_FLIP_H_ACTIONS, _TRANSPOSE_ACTIONS),
+    _compose(_FLIP_V_ACTIONS, _TRANSPOSE_ACTIONS),
+    _compose(_FLIP_V_ACTIONS, _FLIP_H_ACTIONS, _TRANSPOSE_ACTIONS),
+)
+# INVERSE_SYMMETRY_ACTIONS[k][a]: the action on board equivalent to action a on symmetries(board)[k].
+INVERSE_SYMMETRY_ACTIONS = tuple(tuple(m.index(a) for a in ACTIONS) for m in SYMMETRY_ACTIONS)
+
+
+CELL_SHIFTS = (4 * np.arange(16)).astype(np.uint64)
+_ROW_SHIFTS = (16 * np.arange(4)).astype(np.uint64)
+_REVERSED = np.array([1, 2], dtype=np.int64)
+
+
+def pack_boards(boards: np.ndarray) -> np.ndarray:
+    """Pack an (N, 4, 4) array of tile values into an (N,) uint64 array."""
+    flat = np.asarray(boards).reshape(-1, 16)
+    exponents = np.zeros(flat.shape, dtype=np.uint64)
+    nonzero = flat > 0
+    exponents[nonzero] = np.log2(flat[nonzero]).astype(np.uint64)
+    if np.any(exponents > MAX_EXPONENT):
+        raise ValueError("Tile does not fit in a packed board")
+    return np.bitwise_or.reduce(exponents << CELL_SHIFTS, axis=1)
+
+
+def unpack_boards(packed: np.ndarray) -> np.ndarray:
+    """Unpack an (N,) uint64 array into an (N, 4, 4) int64 array of tile values."""
+    exponents = board_exponents(packed).astype(np.int64)
+    tiles = np.where(exponents > 0, np.left_shift(1, exponents), 0)
+    return tiles.reshape(-1, 4, 4)
+
+
+def board_exponents(packed: np.ndarray) -> np.ndarray:
+    """(N, 16) uint8 array of cell exponents in row-major order."""
+    packed = np.asarray(packed, dtype=np.uint64).reshape(-1)
+    return ((packed[:, None] >> CELL_SHIFTS) & np.uint64(NIBBLE_MASK)).astype(np.uint8)
+
+
+def board_lines(packed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, 4) row and (N, 4) column indices into the 16-bit line tables."""
+    packed = np.asarray(packed, dtype=np.uint64).reshape(-1)
+    rows = ((packed[:, None] >> _ROW_SHIFTS) & np.uint64(ROW_MASK)).astype(np.intp)
+    cols = ((transpose_batch(packed)[:, None] >> _ROW_SHIFTS) & np.uint64(ROW_MASK)).astype(np.intp)
+    return rows, cols
+
+
+def transpose_batch(packed: np.ndarray) -> np.ndarray:
+    packed = np.asarray(packed, dtype=np.uint64)
+    a1 = packed & np.uint64(0xF0F00F0FF0F00F0F)
+    a2 = packed & np.uint64(0x0000F0F00000F0F0)
+    a3 = packed & np.uint64(0x0F0F00000F0F0000)
+    a = a1 | (a2 << np.uint64(12)) | (a3 >> np.uint64(12))
+    b1 = a & np.uint64(0xFF00FF0000FF00FF)
+    b2 = a & np.uint64(0x00FF00FF00000000)
+    b3 = a & np.uint64(0x00000000FF00FF00)
+    return b1 | (b2 >> np.uint64(24)) | (b3 << np.uint64(24))
+
+
+def move_batch(packed: np.ndarray, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Apply one action per board; returns (boards, rewards) as (N,) arrays."""
+    packed = np.asarray(packed, dtype=np.uint64).reshape(-1)
+    actions = np.broadcast_to(np.asarray(actions, dtype=np.int64), packed.shape)
+    if np.any((actions < 0) | (actions > 3)):
+        raise ValueError("Invalid action in batch")
+    vertical = (actions % 2) == 0
+    reverse = np.isin(actions, _REVERSED)[:, None]
+    source = np.where(vertical, transpose_batch(packed), packed)
+    rows = ((source[:, None] >> _ROW_SHIFTS) & np.uint64(ROW_MASK)).astype(np.intp)
+    moved_rows = np.where(reverse, ROW_RIGHT[rows], ROW_LEFT[rows]).astype(np.uint64)
+    rewards = np.where(reverse, SCORE_RIGHT[rows], SCORE_LEFT[rows]).sum(axis=1)
+    result = np.bitwise_or.reduce(moved_rows << _ROW_SHIFTS, axis=1)
+    return np.where(vertical, transpose_batch(result), result), rewards
+
+
+def legal_actions_batch(packed: np.ndarray) -> np.ndarray:
+    """(N,) uint8 legal-move masks for an array of packed boards."""
+    rows, cols = board_lines(packed)
+    return np.bitwise_or.reduce(ROW_LEGAL_H[rows], axis=1) | np.bitwise_or.reduce(ROW_LEGAL_V[cols], axis=1)
+
+
+def afterstates_batch(packed: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Batched ``afterstates``: (N, 4) boards, (N, 4) rewards and (N, 4) moved flags."""
+    packed = np.asarray(packed, dtype=np.uint64).reshape(-1)
+    rows, cols = board_lines(packed)
+    col_shifts = _ROW_SHIFTS // np.uint64(4)
+
+    boards = np.empty((packed.shape[0], 4), dtype=np.uint64)
+    boards[:, 0] = np.bitwise_or.reduce(_COL_UP_ARRAY[cols] << col_shifts, axis=1)
+    boards[:, 1] = np.bitwise_or.reduce(ROW_RIGHT[rows].astype(np.uint64) << _ROW_SHIFTS, axis=1)
+    boards[:, 2] = np.bitwise_or.reduce(_COL_DOWN_ARRAY[cols] << col_shifts, axis=1)
+    boards[:, 3] = np.bitwise_or.reduce(ROW_LEFT[rows].astype(np.uint64) << _ROW_SHIFTS, axis=1)
+
+    rewards = np.stack(
+        [
+            SCORE_LEFT[cols].sum(axis=1),
+            SCORE_RIGHT[rows].sum(axis=1),
+            SCORE_RIGHT[cols].sum(axis=1),
+            SCORE_LEFT[rows].sum(axis=1),
+        ],
+        axis=1,
+    )
+    return boards, rewards, boards != packed[:, None]
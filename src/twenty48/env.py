@@ -1,60 +1,113 @@
 from __future__ import annotations
 
 import random
-from typing import List, Tuple
+from typing import Tuple
 
 import numpy as np
 
-from .mechanics import slide_and_merge_line
-from .rules import is_done
+from .bitboard import (
+    count_empty,
+    empty_cells,
+    legal_actions,
+    max_exponent,
+    merged_values,
+    move,
+    pack_board,
+    unpack_board,
+)
 from .utils import clone_rng, create_rng
 
 
 class Twenty48Env:
+    """Single 2048 game.
+
+    The state is kept as a packed 64-bit board (see ``twenty48.bitboard``);
+    ``board`` is a read-only 4x4 view of it. Assign a new array to ``board``
+    to replace the state. Tiles cap at 32768: two 32768 tiles do not merge,
+    and assigning a board with a larger tile raises ``ValueError``.
+    """
+
+    __slots__ = ("rng", "score", "_packed", "_board")
+
     def __init__(self, rng: random.Random | None = None) -> None:
         self.rng = rng if rng is not None else create_rng()
-        self.board = np.zeros((4, 4), dtype=np.int64)
         self.score = 0
-        self.won = False
+        self._packed = 0
+        self._board: np.ndarray | None = None
+
+    @property
+    def board(self) -> np.ndarray:
+        if self._board is None:
+            board = unpack_board(self._packed)
+            board.flags.writeable = False
+            self._board = board
+        return self._board
+
+    @board.setter
+    def board(self, value: np.ndarray) -> None:
+        self._packed = pack_board(value)
+        self._board = None
+
+    @property
+    def packed(self) -> int:
+        return self._packed
+
+    @property
+    def won(self) -> bool:
+        return max_exponent(self._packed) >= 11
 
     def reset(self, seed: int | None = None) -> np.ndarray:
         if seed is not None:
             self.rng = create_rng(seed)
-        self.board = np.zeros((4, 4), dtype=np.int64)
         self.score = 0
-        self.won = False
-        self._spawn_tile()
-        self._spawn_tile()
+        packed, _ = self._spawn_tile(0)
+        packed, _ = self._spawn_tile(packed)
+        self._packed = packed
+        self._board = None
         return self.board.copy()
 
     def step(self, action: int) -> Tuple[np.ndarray, int, bool, dict]:
-        original = self.board.copy()
-        moved_board, reward, merged = self._move(action)
-        moved = not np.array_equal(original, moved_board)
+        original = self._packed
+        moved_board, reward = move(original, action)
+        merged = [{"row": i, "merged": vals} for i, vals in enumerate(merged_values(original, action))]
+        moved = moved_board != original
 
         spawned = None
         invalid_move = False
         if moved:
-            spawned = self._spawn_tile(board=moved_board)
-            self.board = moved_board
+            self._packed, spawned = self._spawn_tile(moved_board)
+            self._board = None
             self.score += reward
         else:
-            self.board = original
             reward = 0
             invalid_move = True
 
-        self.won = bool(self.board.max() >= 2048)
-        done = is_done(self.board)
+        done = not self._has_moves()
+        board = self.board
         info = {
             "invalid_move": invalid_move,
             "moved": moved,
             "score": int(self.score),
-            "max_tile": int(self.board.max()),
+            "max_tile": int(board.max()),
             "won": self.won,
             "spawned": spawned,
             "merged": merged,
         }
-        return self.board.copy(), int(reward), bool(done), info
+        return board.copy(), int(reward), bool(done), info
+
+    def step_fast(self, action: int) -> Tuple[int, int, bool]:
+        """Lean step for rollouts: returns (packed board, reward, done) and builds no info.
+
+        Invalid moves leave the board unchanged and return a reward of 0.
+        """
+        original = self._packed
+        moved_board, reward = move(original, action)
+        if moved_board == original:
+            return original, 0, not self._has_moves()
+        self._packed, _ = self._spawn_tile(moved_board)
+        self._board = None
+        self.score += reward
+        return self._packed, reward, not self._has_moves()
 
     def render(self, mode: str = "human") -> None:
         if mode != "human":
@@ -67,40 +120,17 @@ class Twenty48Env:
 
     def clone(self) -> "Twenty48Env":
         cloned = Twenty48Env(rng=clone_rng(self.rng))
-        cloned.board = self.board.copy()
+        cloned._packed = self._packed
         cloned.score = int(self.score)
-        cloned.won = bool(self.won)
         return cloned
 
-    def _move(self, action: int) -> Tuple[np.ndarray, int, List[dict]]:
-        oriented, undo = self._orient(self.board, action)
-        new_oriented = np.zeros_like(oriented)
-        reward = 0
-        merged_info: List[dict] = []
-        for i in range(4):
-            line, line_reward, merged_vals = slide_and_merge_line(oriented[i, :])
-            new_oriented[i, :] = line
-            reward += line_reward
-            merged_info.append({"row": i, "merged": merged_vals})
-        return undo(new_oriented), reward, merged_info
-
-    def _orient(self, board: np.ndarray, action: int):
-        if action == 3:  # LEFT
-            return board.copy(), lambda b: b
-        if action == 1:  # RIGHT
-            return np.fliplr(board).copy(), np.fliplr
-        if action == 0:  # UP
-            return board.T.copy(), lambda b: b.T
-        if action == 2:  # DOWN
-            return np.fliplr(board.T).copy(), lambda b: np.fliplr(b).T
-        raise ValueError(f"Invalid action: {action}")
-
-    def _spawn_tile(self, board: np.ndarray | None = None) -> Tuple[int, int, int] | None:
-        target = board if board is not None else self.board
-        empties = list(zip(*np.where(target == 0)))
+    def _has_moves(self) -> bool:
+        return count_empty(self._packed) > 0 or legal_actions(self._packed) != 0
+
+    def _spawn_tile(self, packed: int) -> Tuple[int, Tuple[int, int, int] | None]:
+        empties = empty_cells(packed)
         if not empties:
-            return None
-        r, c = empties[self.rng.randrange(len(empties))]
-        value = 4 if self.rng.random() < 0.1 else 2
-        target[r, c] = value
-        return int(r), int(c), int(value)
+            return packed, None
+        cell = empties[self.rng.randrange(len(empties))]
+        exponent = 2 if self.rng.random() < 0.1 else 1
+        return packed | (exponent << (4 * cell)), (cell // 4, cell % 4, 1 << exponent)
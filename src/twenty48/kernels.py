@@ -0,0 +1,113 @@
+"""Numba-compiled inner loops for mechanics, rules and heuristics.
+
+When Numba is importable (``HAVE_NUMBA``) these functions are compiled with
+``njit`` and the public wrappers in ``mechanics``, ``rules`` and
+``ai.heuristics`` dispatch to them; otherwise they stay plain Python and the
+wrappers keep their pure-Python implementations. Kernels take numpy arrays
+only (no lists) so they compile to a single specialization per dtype.
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit``, usable bare or with options."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def slide_line(line: np.ndarray) -> Tuple[np.ndarray, int, np.ndarray, int]:
+    """Slide a length-4 tile line left: (line, reward, merged values, merge count).
+
+    Like the packed-board rules, two tiles of ``32768`` or more do not merge.
+    """
+    output = np.zeros(4, dtype=np.int64)
+    merged = np.zeros(2, dtype=np.int64)
+    count = 0
+    reward = 0
+    n = 0
+    previous = 0
+    for i in range(line.shape[0]):
+        tile = np.int64(line[i])
+        if tile == 0:
+            continue
+        if previous == tile and tile < 32768:
+            output[n - 1] = tile * 2
+            merged[count] = tile * 2
+            reward += tile * 2
+            count += 1
+            previous = 0
+        else:
+            output[n] = tile
+            n += 1
+            previous = tile
+    return output, reward, merged, count
+
+
+@njit(cache=True)
+def has_moves(board: np.ndarray) -> bool:
+    """True if a 4x4 tile board has an empty cell or two equal mergeable neighbours.
+
+    Like the packed-board rules, two tiles of ``32768`` or more do not merge.
+    """
+    for r in range(4):
+        for c in range(4):
+            tile = board[r, c]
+            if tile == 0:
+                return True
+            if tile >= 32768:
+                continue
+            if c + 1 < 4 and board[r, c + 1] == tile:
+                return True
+            if r + 1 < 4 and board[r + 1, c] == tile:
+                return True
+    return False
+
+
+@njit(cache=True)
+def smoothness(log_board: np.ndarray) -> float:
+    total = 0.0
+    for r in range(4):
+        for c in range(4):
+            if log_board[r, c] == 0:
+                continue
+            if c + 1 < 4 and log_board[r, c + 1] > 0:
+                total -= abs(log_board[r, c] - log_board[r, c + 1])
+            if r + 1 < 4 and log_board[r + 1, c] > 0:
+                total -= abs(log_board[r, c] - log_board[r + 1, c])
+    return total
+
+
+@njit(cache=True)
+def monotonicity(log_board: np.ndarray) -> float:
+    total = 0.0
+    for r in range(4):
+        inc = 0.0
+        dec = 0.0
+        for c in range(3):
+            if log_board[r, c] > log_board[r, c + 1]:
+                dec += log_board[r, c] - log_board[r, c + 1]
+            else:
+                inc += log_board[r, c + 1] - log_board[r, c]
+        total += max(inc, dec)
+    for c in range(4):
+        inc = 0.0
+        dec = 0.0
+        for r in range(3):
+            if log_board[r, c] > log_board[r + 1, c]:
+                dec += log_board[r, c] - log_board[r + 1, c]
+            else:
+                inc += log_board[r + 1, c] - log_board[r, c]
+        total += max(inc, dec)
+    return total
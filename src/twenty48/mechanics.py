@@ -4,15 +4,32 @@ from typing import Iterable, List, Tuple
 
 import numpy as np
 
+from . import kernels
+from .bitboard import MAX_EXPONENT
+
+# Tiles at or above this value never merge, matching the packed engine.
+_MAX_TILE = 1 << MAX_EXPONENT
+
 
 def slide_and_merge_line(line: Iterable[int]) -> Tuple[np.ndarray, int, List[int]]:
-    """Slide a single line to the left and merge equal tiles once per move."""
+    """Slide a single line to the left and merge equal tiles once per move.
+
+    Like the packed engine, two tiles of 32768 or more do not merge.
+    """
+    if kernels.HAVE_NUMBA:
+        values = np.asarray(line, dtype=np.int64) if isinstance(line, np.ndarray) else np.fromiter(line, dtype=np.int64)
+        output, reward, merged, count = kernels.slide_line(values)
+        return output, int(reward), merged[:count].tolist()
+    return _slide_and_merge_line_py(line)
+
+
+def _slide_and_merge_line_py(line: Iterable[int]) -> Tuple[np.ndarray, int, List[int]]:
     tiles = [int(x) for x in line if int(x) != 0]
     merged_values: List[int] = []
     output: List[int] = []
     i = 0
     while i < len(tiles):
-        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+        if i + 1 < len(tiles) and tiles[i] == tiles[i + 1] and tiles[i] < _MAX_TILE:
             new_val = tiles[i] * 2
             output.append(new_val)
             merged_values.append(new_val)
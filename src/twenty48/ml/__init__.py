@@ -1,11 +1,14 @@
-from .encoding import encode_board
-from .dataset import Twenty48ImitationDataset, split_dataset
+from .encoding import encode_board, encode_boards, encode_packed
+from .dataset import Twenty48ImitationDataset, batch_loader, split_dataset
 from .model import PolicyNet
 from .inference import select_action
 
 __all__ = [
     "encode_board",
+    "encode_boards",
+    "encode_packed",
     "Twenty48ImitationDataset",
+    "batch_loader",
     "split_dataset",
     "PolicyNet",
     "select_action",
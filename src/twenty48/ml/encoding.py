@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import numpy as np
 
+from twenty48.bitboard import board_exponents
+
 
 def encode_board(board: np.ndarray, max_pow: int = 15) -> np.ndarray:
     """One-hot encode board into (C, 4, 4), C=max_pow+1.
@@ -9,19 +11,24 @@ def encode_board(board: np.ndarray, max_pow: int = 15) -> np.ndarray:
     Channel 0 represents empty, channel k represents tile value 2**k.
     Values above max_pow are clamped into max_pow channel.
     """
-    channels = max_pow + 1
-    encoded = np.zeros((channels, 4, 4), dtype=np.float32)
-
-    empties = board == 0
-    if np.any(empties):
-        encoded[0][empties] = 1.0
-
-    nonzero = board > 0
-    if np.any(nonzero):
-        powers = np.log2(board[nonzero]).astype(np.int64)
-        powers = np.clip(powers, 1, max_pow)
-        rows, cols = np.where(nonzero)
-        for r, c, p in zip(rows, cols, powers):
-            encoded[p, r, c] = 1.0
-
-    return encoded
+    return encode_boards(np.asarray(board)[None], max_pow=max_pow)[0]
+
+
+def encode_boards(boards: np.ndarray, max_pow: int = 15) -> np.ndarray:
+    """``encode_board`` for an (N, 4, 4) array of tile values: (N, C, 4, 4) float32."""
+    boards = np.asarray(boards).reshape(-1, 4, 4)
+    powers = np.zeros(boards.shape, dtype=np.int64)
+    nonzero = boards > 0
+    powers[nonzero] = np.clip(np.log2(boards[nonzero]).astype(np.int64), 1, max_pow)
+    return _one_hot(powers, max_pow)
+
+
+def encode_packed(packed: np.ndarray, max_pow: int = 15) -> np.ndarray:
+    """``encode_boards`` for an (N,) array of packed boards, read straight from the exponents."""
+    exponents = board_exponents(packed).reshape(-1, 4, 4).astype(np.int64)
+    return _one_hot(np.minimum(exponents, max_pow), max_pow)
+
+
+def _one_hot(powers: np.ndarray, max_pow: int) -> np.ndarray:
+    channels = np.arange(max_pow + 1).reshape(1, -1, 1, 1)
+    return (powers[:, None] == channels).astype(np.float32)
@@ -0,0 +1,394 @@
+"""Expectimax self-play dataset generation, serial or sharded over worker processes.
+
+Datasets are streamed by ``ChunkWriter``: ``<name>.chunk00000.npz`` files
+plus a ``<name>.manifest.json`` that records finished games, so an
+interrupted run can resume. ``merge_manifest`` turns a manifest into a single
+``.npz`` one chunk at a time. A sharded dataset's top-level manifest lists
+one such chunked shard per fixed, contiguous range of game seeds. Shard
+contents depend only on their seeds and the generation config, so the output
+is the same for any number of workers.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import random
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from twenty48.ai.batched import BatchedExpectimax
+from twenty48.ai.book import Book, BookAgent
+from twenty48.ai.expectimax import ExpectimaxSearcher, adaptive_depth
+from twenty48.ai.transposition import TranspositionTable
+from twenty48.bitboard import pack_boards, unpack_boards
+from twenty48.env import Twenty48Env
+
+# Stored arrays and their dtypes, one row per sampled move.
+FIELDS: Dict[str, type] = {
+    "boards": np.int16,
+    "actions": np.uint8,
+    "scores": np.int32,
+    "rewards": np.int32,
+    "max_tiles": np.int16,
+    "dones": np.bool_,
+    "step_indices": np.int32,
+    "seeds": np.int32,
+    "depths": np.int16,
+}
+# Packed layout: each board is one uint64 of 4-bit exponents. ``max_tiles`` stays, since it is
+# the max tile after the move and cannot be derived from the board before it.
+PACKED_FIELDS: Dict[str, type] = {"packed": np.uint64, **{name: dtype for name, dtype in FIELDS.items() if name != "boards"}}
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+@dataclass
+class GenerateConfig:
+    """Search and sampling options shared by every generated game."""
+
+    depth: int = 3
+    max_cells: int = 4
+    table_entries: int | None = None
+    min_prob: float | None = None
+    max_fours: int | None = None
+    time_ms: float | None = None
+    symmetry: bool = False
+    batched: bool = False
+    depth_policy: str = "fixed"
+    max_nodes: int | None = None
+    book: str | None = None
+    sample_prob: float = 1.0
+    include_invalid: bool = False
+    max_steps: int | None = None
+    packed: bool = False
+
+    @property
+    def fields(self) -> Dict[str, type]:
+        return PACKED_FIELDS if self.packed else FIELDS
+
+    def make_searcher(self):
+        """A fresh single-process searcher for one game (without the book)."""
+        policy = functools.partial(adaptive_depth, max_depth=self.depth) if self.depth_policy == "adaptive" else None
+        if self.batched:
+            return BatchedExpectimax(depth=self.depth, depth_policy=policy)
+        return ExpectimaxSearcher(
+            depth=self.depth,
+            max_cells=self.max_cells,
+            table=TranspositionTable(self.table_entries),
+            min_prob=self.min_prob,
+            max_fours=self.max_fours,
+            time_ms=self.time_ms,
+            symmetry=self.symmetry,
+            max_nodes=self.max_nodes,
+            depth_policy=policy,
+        )
+
+
+def pack_arrays(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Convert dataset arrays to the ``PACKED_FIELDS`` layout."""
+    packed = {name: arrays[name] for name in PACKED_FIELDS if name != "packed"}
+    return {"packed": pack_boards(arrays["boards"]), **packed}
+
+
+def unpack_arrays(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Convert ``PACKED_FIELDS`` arrays back to the ``FIELDS`` layout."""
+    boards = unpack_boards(arrays["packed"]).astype(np.int16)
+    return {name: boards if name == "boards" else arrays[name] for name in FIELDS}
+
+
+class ChunkWriter:
+    """Streams rows to fixed-size ``<stem>.chunk00000.npz`` files next to a resumable manifest.
+
+    Rows go into preallocated buffers of ``chunk_size`` rows, so memory does
+    not grow with the dataset. Whenever a chunk is written the manifest
+    (``manifest_path(out_path)``) is atomically replaced; it lists the
+    chunks, the rows of finished games (``rows``) and their seeds. Rows past
+    ``rows`` belong to an unfinished game and are ignored by readers; with
+    ``resume`` they are dropped and games in ``completed`` can be skipped.
+    """
+
+    def __init__(
+        self,
+        out_path: str | Path,
+        config: GenerateConfig,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        resume: bool = False,
+    ) -> None:
+        self.out_path = Path(out_path)
+        self.manifest = manifest_path(self.out_path)
+        self.config = config
+        self.chunk_size = int(chunk_size)
+        self._buffers = {
+            name: np.zeros((self.chunk_size, 4, 4) if name == "boards" else self.chunk_size, dtype=dtype)
+            for name, dtype in FIELDS.items()
+        }
+        self._fill = 0
+        self.chunks: List[Dict] = []
+        self.completed: List[int] = []
+        self.rows = 0
+        self.steps = 0
+        self._written = 0
+        if resume and self.manifest.exists():
+            self._resume()
+
+    def append(self, *row) -> None:
+        """Add one row, with values in ``FIELDS`` order."""
+        for buffer, value in zip(self._buffers.values(), row):
+            buffer[self._fill] = value
+        self._fill += 1
+        if self._fill == self.chunk_size:
+            self.flush()
+
+    def end_game(self, seed: int | None, steps: int) -> None:
+        """Mark every row appended so far as belonging to finished games."""
+        self.rows = self._written + self._fill
+        self.steps += steps
+        self.completed.append(-1 if seed is None else int(seed))
+
+    def flush(self) -> None:
+        """Write buffered rows as the next chunk and update the manifest."""
+        if self._fill:
+            path = self.out_path.with_name(f"{self.out_path.stem}.chunk{len(self.chunks):05d}.npz")
+            arrays = {name: buffer[: self._fill] for name, buffer in self._buffers.items()}
+            np.savez_compressed(path, **(pack_arrays(arrays) if self.config.packed else arrays))
+            self.chunks.append({"path": path.name, "rows": self._fill})
+            self._written += self._fill
+            self._fill = 0
+        self._write_manifest()
+
+    def close(self) -> Path:
+        self.flush()
+        return self.manifest
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "fields": list(self.config.fields),
+            "config": asdict(self.config),
+            "chunk_size": self.chunk_size,
+            "rows": self.rows,
+            "steps": self.steps,
+            "games": len(self.completed),
+            "completed": self.completed,
+            "chunks": self.chunks,
+        }
+        _write_json(self.manifest, manifest)
+
+    def _resume(self) -> None:
+        manifest = read_manifest(self.manifest)
+        self.rows = int(manifest["rows"])
+        self.steps = int(manifest["steps"])
+        self.completed = list(manifest["completed"])
+        # Keep whole chunks of finished games; reload the committed head of the chunk after them.
+        for chunk in manifest["chunks"]:
+            if self._written + chunk["rows"] <= self.rows:
+                self.chunks.append(chunk)
+                self._written += chunk["rows"]
+                continue
+            keep = self.rows - self._written
+            if keep > 0:
+                with np.load(self.manifest.parent / chunk["path"]) as data:
+                    arrays = unpack_arrays(data) if self.config.packed else data
+                    for name, buffer in self._buffers.items():
+                        buffer[:keep] = arrays[name][:keep]
+                self._fill = keep
+            break
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def play_game(env: Twenty48Env, searcher, seed: int | None, config: GenerateConfig, writer) -> Tuple[int, int]:
+    """Play one game, appending sampled moves to ``writer``; returns (steps, samples).
+
+    Sampling draws from a ``random.Random(seed)`` of its own, so a seeded
+    game yields the same rows wherever and in whatever order it is played.
+    """
+    env.reset(seed=seed)
+    rng = random.Random(seed)
+    done = False
+    step = 0
+    steps = 0
+    samples = 0
+    while not done:
+        action = searcher.choose_action(env)
+        board_before = env.board.copy()
+        _, reward, done, info = env.step(action)
+
+        if info["invalid_move"] and not config.include_invalid:
+            step += 1
+            continue
+
+        if rng.random() <= config.sample_prob:
+            writer.append(
+                board_before,
+                action,
+                info["score"],
+                reward,
+                info["max_tile"],
+                done,
+                step,
+                -1 if seed is None else int(seed),
+                searcher.completed_depth,
+            )
+            samples += 1
+
+        step += 1
+        steps += 1
+        if config.max_steps is not None and step >= config.max_steps:
+            break
+    writer.end_game(seed, steps)
+    return steps, samples
+
+
+def shard_path(out_path: str | Path, index: int) -> Path:
+    """Base path of shard ``index``; its chunks and manifest are named after it."""
+    out_path = Path(out_path)
+    return out_path.with_name(f"{out_path.stem}.shard{index:05d}.npz")
+
+
+def manifest_path(out_path: str | Path) -> Path:
+    return Path(out_path).with_suffix(".manifest.json")
+
+
+def generate_shard(
+    config: GenerateConfig,
+    first_seed: int,
+    games: int,
+    path: str | Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = False,
+) -> Dict:
+    """Stream seeds ``first_seed .. first_seed + games - 1`` into a ``ChunkWriter`` at ``path``.
+
+    With ``resume`` the games already recorded in the shard's manifest are
+    skipped; ``played`` in the returned manifest entry counts the others.
+    """
+    writer = ChunkWriter(path, config, chunk_size=chunk_size, resume=resume)
+    finished = set(writer.completed)
+    book = Book.open(config.book) if config.book else None
+    env = Twenty48Env()
+    for seed in range(first_seed, first_seed + games):
+        if seed in finished:
+            continue
+        searcher = config.make_searcher()
+        if book is not None:
+            searcher = BookAgent(book, searcher)
+        play_game(env, searcher, seed, config, writer)
+    manifest = writer.close()
+    return {
+        "manifest": manifest.name,
+        "first_seed": first_seed,
+        "games": games,
+        "steps": writer.steps,
+        "samples": writer.rows,
+        "played": games - len(finished),
+    }
+
+
+def write_manifest(path: str | Path, config: GenerateConfig, shards: List[Dict]) -> Path:
+    """Write the top-level manifest for finished ``shards`` (sorted by first seed)."""
+    shards = sorted(shards, key=lambda shard: shard["first_seed"])
+    manifest = {
+        "fields": list(config.fields),
+        "config": asdict(config),
+        "games": sum(shard["games"] for shard in shards),
+        "steps": sum(shard["steps"] for shard in shards),
+        "samples": sum(shard["samples"] for shard in shards),
+        "shards": shards,
+    }
+    path = Path(path)
+    _write_json(path, manifest)
+    return path
+
+
+def read_manifest(path: str | Path) -> Dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def iter_manifest(path: str | Path, fields: Sequence[str] | None = None) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield the committed rows of each chunk of a chunk or shard manifest, in seed order.
+
+    ``fields`` selects arrays; names the dataset does not store are skipped.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    fields = [name for name in (manifest["fields"] if fields is None else fields) if name in manifest["fields"]]
+    if "shards" in manifest:
+        for shard in manifest["shards"]:
+            yield from iter_manifest(path.parent / shard["manifest"], fields)
+        return
+    remaining = int(manifest["rows"])
+    for chunk in manifest["chunks"]:
+        if remaining <= 0:
+            break
+        with np.load(path.parent / chunk["path"]) as data:
+            yield {name: data[name][:remaining] for name in fields}
+        remaining -= chunk["rows"]
+
+
+def manifest_rows(path: str | Path) -> int:
+    """Committed rows of a chunk or shard manifest."""
+    manifest = read_manifest(path)
+    return int(manifest["samples"] if "shards" in manifest else manifest["rows"])
+
+
+def merge_manifest(path: str | Path, out_path: str | Path) -> Path:
+    """Write the committed rows of a chunk or shard manifest as one ``.npz`` at ``out_path``.
+
+    Each field is streamed chunk by chunk into its compressed ``.npy``
+    member, so memory stays at one chunk of one field. The file is written
+    under a temporary name and moved into place when complete.
+    """
+    manifest = read_manifest(path)
+    rows = manifest_rows(path)
+    dtypes = {**FIELDS, **PACKED_FIELDS}
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for name in manifest["fields"]:
+            dtype = np.dtype(dtypes[name])
+            header = {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (rows, 4, 4) if name == "boards" else (rows,),
+            }
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                np.lib.format.write_array_header_1_0(member, header)
+                for block in iter_manifest(path, [name]):
+                    member.write(np.ascontiguousarray(block[name], dtype=dtype).tobytes())
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def remove_manifest(path: str | Path) -> None:
+    """Delete a chunk or shard manifest and every chunk file it lists."""
+    path = Path(path)
+    manifest = read_manifest(path)
+    for shard in manifest.get("shards", []):
+        remove_manifest(path.parent / shard["manifest"])
+    for chunk in manifest.get("chunks", []):
+        (path.parent / chunk["path"]).unlink(missing_ok=True)
+    path.unlink()
+
+
+def load_manifest(path: str | Path, fields: Sequence[str] | None = None) -> Dict[str, np.ndarray]:
+    """Concatenate ``iter_manifest`` into one array per field."""
+    stored = read_manifest(path)["fields"]
+    fields = [name for name in (stored if fields is None else fields) if name in stored]
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in fields}
+    for block in iter_manifest(path, fields):
+        for name in fields:
+            parts[name].append(block[name])
+    dtypes = {**FIELDS, **PACKED_FIELDS}
+    return {
+        name: np.concatenate(arrays) if arrays else np.zeros((0, 4, 4) if name == "boards" else 0, dtype=dtypes[name])
+        for name, arrays in parts.items()
+    }
@@ -5,7 +5,7 @@ from typing import List
 import numpy as np
 import torch
 
-from twenty48.ai.expectimax import apply_move
+from twenty48.bitboard import legal_actions, pack_board
 
 from .encoding import encode_board
 from .model import PolicyNet
@@ -24,8 +24,8 @@ def select_action(board: np.ndarray, model: PolicyNet, max_pow: int = 15, device
     with torch.no_grad():
         logits = model(x)[0]
 
+    mask = legal_actions(pack_board(board))
     for action in _sorted_actions_from_logits(logits):
-        _, _, moved = apply_move(board, action)
-        if moved:
+        if mask >> action & 1:
             return int(action)
     return 0
@@ -0,0 +1,96 @@
+"""Uncompressed directory-of-``.npy`` datasets that open as genuine memory maps.
+
+A dataset directory holds one ``<field>.npy`` per column and a ``meta.json``
+with the row count and field list. Each file is opened with
+``np.load(..., mmap_mode="r")``, so opening is instant and every process
+reading the dataset shares its pages through the page cache.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Mapping
+
+import numpy as np
+
+from twenty48.bitboard import pack_boards, unpack_boards
+
+from .generate import FIELDS, PACKED_FIELDS, iter_manifest, manifest_rows, read_manifest
+
+META_NAME = "meta.json"
+LAYOUTS = ("same", "packed", "unpacked")
+
+
+def is_npy_dir(path: str | Path) -> bool:
+    return (Path(path) / META_NAME).is_file()
+
+
+def open_npy_dir(path: str | Path, mmap_mode: str | None = "r") -> Dict[str, np.ndarray]:
+    """Every field of a dataset directory, memory-mapped by default."""
+    path = Path(path)
+    meta = json.loads((path / META_NAME).read_text(encoding="utf-8"))
+    return {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in meta["fields"]}
+
+
+def _column(block: Mapping[str, np.ndarray], name: str) -> np.ndarray:
+    """Field ``name`` of a block, converting between the board layouts if needed."""
+    if name in block:
+        return block[name]
+    if name == "packed":
+        return pack_boards(block["boards"])
+    return unpack_boards(block["packed"]).astype(np.int16)
+
+
+def convert_to_npy_dir(src: str | Path, out: str | Path, layout: str = "same") -> Path:
+    """Write an ``.npz`` or manifest dataset as a dataset directory at ``out``.
+
+    ``layout`` keeps the source board layout or forces ``"packed"`` /
+    ``"unpacked"`` boards. Manifests are copied one chunk at a time and
+    ``.npz`` files one field at a time, so memory stays at one chunk or
+    field. An existing dataset directory at ``out`` is replaced.
+    ``meta.json`` is written last; a directory without it is an incomplete
+    conversion.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+    src = Path(src)
+    out = Path(out)
+    if src.suffix == ".json":
+        stored = read_manifest(src)["fields"]
+        rows = manifest_rows(src)
+    else:
+        npz = np.load(src)
+        stored = list(npz.files)
+        rows = int(npz["actions"].shape[0])
+    packed = "packed" in stored if layout == "same" else layout == "packed"
+    fields = PACKED_FIELDS if packed else FIELDS
+    shapes = {name: (rows, 4, 4) if name == "boards" else (rows,) for name in fields}
+
+    if out.exists():
+        if not is_npy_dir(out) and any(out.iterdir()):
+            raise FileExistsError(f"{out} exists and is not a dataset directory")
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+    columns = {
+        name: np.lib.format.open_memmap(out / f"{name}.npy", mode="w+", dtype=dtype, shape=shapes[name])
+        for name, dtype in fields.items()
+    }
+    if src.suffix == ".json":
+        start = 0
+        for block in iter_manifest(src):
+            size = block["actions"].shape[0]
+            for name, column in columns.items():
+                column[start : start + size] = _column(block, name)
+            start += size
+    else:
+        with npz:
+            for name, column in columns.items():
+                column[:] = _column(npz, name)
+    for column in columns.values():
+        column.flush()
+    del columns
+
+    meta = {"fields": list(fields), "rows": rows, "source": str(src)}
+    (out / META_NAME).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return out
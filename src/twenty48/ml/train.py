@@ -9,7 +9,7 @@ import torch
 from torch import nn
 from torch.utils.data import DataLoader
 
-from .dataset import Twenty48ImitationDataset, split_dataset
+from .dataset import Twenty48ImitationDataset, batch_loader, split_dataset
 from .model import PolicyNet
 
 
@@ -26,6 +26,7 @@ def train_policy(
     log_file: str | None = None,
     metrics_csv: str | None = None,
     run_info: Dict[str, str] | None = None,
+    batch_loading: bool = True,
 ) -> Tuple[Path, Dict[str, float]]:
     if device == "auto":
         device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -36,8 +37,12 @@ def train_policy(
     dataset = Twenty48ImitationDataset(dataset_path, max_pow=max_pow)
     train_set, val_set = split_dataset(dataset, val_ratio=val_ratio, seed=seed)
 
-    train_loader = DataLoader(train_set, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_set, batch_size=batch_size, shuffle=False)
+    if batch_loading:
+        train_loader = batch_loader(train_set, batch_size, shuffle=True)
+        val_loader = batch_loader(val_set, batch_size)
+    else:
+        train_loader = DataLoader(train_set, batch_size=batch_size, shuffle=True)
+        val_loader = DataLoader(val_set, batch_size=batch_size, shuffle=False)
 
     model = PolicyNet(in_channels=max_pow + 1).to(device)
     optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=1e-5)
@@ -56,7 +61,7 @@ def train_policy(
             "train_policy log",
             f"dataset={dataset_path}",
             f"epochs={epochs} batch_size={batch_size} lr={lr} val_ratio={val_ratio}",
-            f"max_pow={max_pow} seed={seed} device={device}",
+            f"max_pow={max_pow} seed={seed} device={device} batch_loading={batch_loading}",
         ]
         if run_info:
             for key, value in run_info.items():
@@ -2,19 +2,43 @@ from __future__ import annotations
 
 import numpy as np
 
+from . import kernels
+from .bitboard import MAX_EXPONENT, count_empty, legal_actions, pack_board
+
+# Largest tile that merges and fits in a packed board.
+_MAX_TILE = 1 << MAX_EXPONENT
+
 
 def has_moves(board: np.ndarray) -> bool:
+    """True if any move is legal; tiles of 32768 and above never merge.
+
+    Boards with tiles too large to pack are handled by a plain cell scan.
+    """
+    if kernels.HAVE_NUMBA:
+        return bool(kernels.has_moves(np.asarray(board)))
+    return _has_moves_py(board)
+
+
+def _has_moves_py(board: np.ndarray) -> bool:
+    board = np.asarray(board)
+    if board.max() > _MAX_TILE:
+        return _has_moves_scan(board)
+    packed = pack_board(board)
+    return count_empty(packed) > 0 or legal_actions(packed) != 0
+
+
+def _has_moves_scan(board: np.ndarray) -> bool:
     if np.any(board == 0):
         return True
 
     for r in range(4):
         for c in range(3):
-            if board[r, c] == board[r, c + 1]:
+            if board[r, c] == board[r, c + 1] and board[r, c] < _MAX_TILE:
                 return True
 
     for r in range(3):
         for c in range(4):
-            if board[r, c] == board[r + 1, c]:
+            if board[r, c] == board[r + 1, c] and board[r, c] < _MAX_TILE:
                 return True
 
     return False
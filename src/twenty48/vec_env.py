@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .bitboard import board_exponents, legal_actions_batch, move_batch, unpack_boards
+
+# Uniforms drawn from an env's generator at a time; each spawn uses two.
+_DRAW_BLOCK = 64
+
+
+class VecTwenty48Env:
+    """N independent games stepped together on packed uint64 boards.
+
+    Every game draws its spawns from its own ``numpy.random.Generator``, so
+    a game's tiles depend only on its own seed and moves. ``reset(seeds)``
+    takes one seed per env (env ``i`` then plays exactly like a single-env
+    batch reset with ``seeds[i]``), or a single seed (or ``None``) that is
+    split into independent per-env streams. With ``auto_reset`` finished
+    games are restarted inside ``step`` from their own stream, and their last
+    board/score are kept in ``final_boards``/``final_scores``.
+    """
+
+    def __init__(self, num_envs: int, auto_reset: bool = True, seed: int | Sequence[int] | None = None) -> None:
+        if num_envs <= 0:
+            raise ValueError(f"num_envs must be positive: {num_envs}")
+        self.num_envs = int(num_envs)
+        self.auto_reset = bool(auto_reset)
+        self._seed(seed)
+        self.boards = np.zeros(self.num_envs, dtype=np.uint64)
+        self.scores = np.zeros(self.num_envs, dtype=np.int64)
+        self.dones = np.zeros(self.num_envs, dtype=np.bool_)
+        self.final_boards = np.zeros(self.num_envs, dtype=np.uint64)
+        self.final_scores = np.zeros(self.num_envs, dtype=np.int64)
+
+    def reset(self, seeds: int | Sequence[int] | None = None) -> np.ndarray:
+        if seeds is not None:
+            self._seed(seeds)
+        self.boards = self._new_boards(np.arange(self.num_envs))
+        self.scores = np.zeros(self.num_envs, dtype=np.int64)
+        self.dones = np.zeros(self.num_envs, dtype=np.bool_)
+        return self.boards.copy()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Step every game; returns (boards, rewards, dones, invalid)."""
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got shape {actions.shape}")
+
+        moved_boards, rewards = move_batch(self.boards, actions)
+        invalid = (moved_boards == self.boards) | self.dones
+        rewards = np.where(invalid, 0, rewards)
+        moved = ~invalid
+
+        boards = self.boards.copy()
+        envs = np.flatnonzero(moved)
+        boards[envs] = _spawn(moved_boards[envs], self._draws(envs))
+        self.boards = boards
+        self.scores += rewards
+
+        dones = self.dones | ~has_moves_batch(self.boards)
+        self.dones = dones
+        if self.auto_reset and np.any(dones):
+            self.final_boards = np.where(dones, self.boards, self.final_boards)
+            self.final_scores = np.where(dones, self.scores, self.final_scores)
+            self.boards[dones] = self._new_boards(np.flatnonzero(dones))
+            self.scores[dones] = 0
+            self.dones = np.zeros(self.num_envs, dtype=np.bool_)
+
+        return self.boards.copy(), rewards, dones, invalid
+
+    def tile_boards(self) -> np.ndarray:
+        """Current boards as an (N, 4, 4) int64 array of tile values."""
+        return unpack_boards(self.boards)
+
+    def _seed(self, seed: int | Sequence[int] | None) -> None:
+        self.rngs = _env_rngs(seed, self.num_envs)
+        self._buffer = np.zeros((self.num_envs, _DRAW_BLOCK), dtype=np.float64)
+        self._cursor = np.full(self.num_envs, _DRAW_BLOCK, dtype=np.int64)
+
+    def _draws(self, envs: np.ndarray) -> np.ndarray:
+        """The next two uniforms of each env in ``envs`` (distinct indices), shape (len(envs), 2)."""
+        for i in envs[self._cursor[envs] >= _DRAW_BLOCK]:
+            self._buffer[i] = self.rngs[i].random(_DRAW_BLOCK)
+            self._cursor[i] = 0
+        cursor = self._cursor[envs]
+        self._cursor[envs] = cursor + 2
+        return np.stack([self._buffer[envs, cursor], self._buffer[envs, cursor + 1]], axis=1)
+
+    def _new_boards(self, envs: np.ndarray) -> np.ndarray:
+        boards = np.zeros(envs.shape[0], dtype=np.uint64)
+        boards = _spawn(boards, self._draws(envs))
+        return _spawn(boards, self._draws(envs))
+
+
+def spawn_tiles(boards: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Spawn a 2 (p=0.9) or 4 (p=0.1) on a uniformly chosen empty cell of every board."""
+    boards = np.asarray(boards, dtype=np.uint64)
+    cell_draws = rng.random(boards.shape[0])
+    return _spawn(boards, np.stack([cell_draws, rng.random(boards.shape[0])], axis=1))
+
+
+def _spawn(boards: np.ndarray, draws: np.ndarray) -> np.ndarray:
+    """Spawn on every board from per-board (cell, tile) uniforms of shape (N, 2)."""
+    empty = board_exponents(boards) == 0
+    counts = empty.sum(axis=1)
+    picks = (draws[:, 0] * counts).astype(np.int64)
+    cells = np.argmax(np.cumsum(empty, axis=1) > picks[:, None], axis=1).astype(np.uint64)
+    exponents = np.where(draws[:, 1] < 0.1, 2, 1).astype(np.uint64)
+    spawned = boards | (exponents << (np.uint64(4) * cells))
+    return np.where(counts > 0, spawned, boards)
+
+
+def has_moves_batch(boards: np.ndarray) -> np.ndarray:
+    return legal_actions_batch(boards) != 0
+
+
+def _env_rngs(seed: int | Sequence[int] | None, num_envs: int) -> List[np.random.Generator]:
+    """One generator per env: from ``seed[i]``, or spawned from a single seed."""
+    if seed is None or isinstance(seed, (int, np.integer)):
+        return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(num_envs)]
+    seeds = [int(s) for s in seed]
+    if len(seeds) != num_envs:
+        raise ValueError(f"Expected {num_envs} seeds, got {len(seeds)}")
+    return [np.random.default_rng(s) for s in seeds]
@@ -0,0 +1,76 @@
+import numpy as np
+
+from twenty48.ai.batched import BatchedExpectimax
+from twenty48.ai.expectimax import ExpectimaxSearcher
+from twenty48.ai.heuristics import evaluate_batch, evaluate_packed
+from twenty48.bitboard import actions_from_mask, afterstates, empty_cells
+from twenty48.env import Twenty48Env
+
+
+def _boards(seed, steps):
+    env = Twenty48Env()
+    env.reset(seed=seed)
+    boards = []
+    for i in range(steps):
+        env.step((3, 2)[i % 2] if i % 5 else 0)
+        boards.append(env.packed)
+    return boards
+
+
+def test_evaluate_batch_matches_scalar():
+    boards = _boards(seed=2, steps=30)
+    expected = [evaluate_packed(board) for board in boards]
+    assert np.allclose(evaluate_batch(np.array(boards, dtype=np.uint64)), expected, rtol=0, atol=1e-9)
+
+
+def test_batched_search_matches_full_expansion():
+    for board in _boards(seed=9, steps=12)[::3]:
+        full = ExpectimaxSearcher(depth=2, max_cells=16)
+        expected = full.search(board)
+        action, value = BatchedExpectimax(depth=2).search(board)
+        assert abs(value - expected[1]) < 1e-9
+        # Mirrored moves can tie exactly and be split by rounding.
+        assert abs(full.chance_value(afterstates(board)[0][action], 1) - expected[1]) < 1e-9
+
+
+def _frontiers(board, depth):
+    """Unique chance/max boards per ply and the expected evaluator call sizes, in call order."""
+    chance = {afterstates(board)[0][a] for a in actions_from_mask(afterstates(board)[2])}
+    chance_sizes, max_sizes, stuck_sizes = [], [], []
+    for remaining in range(depth - 1, -1, -1):
+        chance_sizes.append(len(chance))
+        maxes = set()
+        for after in chance:
+            cells = empty_cells(after)
+            maxes.update([after | (e << (4 * c)) for c in cells for e in (1, 2)] if cells else [after])
+        max_sizes.append(len(maxes))
+        if remaining == 0:
+            break
+        chance = set()
+        stuck = 0
+        for node in maxes:
+            boards, _, mask = afterstates(node)
+            stuck += mask == 0
+            chance.update(boards[a] for a in actions_from_mask(mask))
+        stuck_sizes.append(stuck)
+    calls = [max_sizes[-1]] + [size for size in reversed(stuck_sizes) if size]
+    return chance_sizes, max_sizes, calls
+
+
+def test_batched_search_scores_each_ply_in_one_call():
+    for depth, board in ((2, _boards(seed=6, steps=8)[-1]), (3, _boards(seed=4, steps=40)[-1])):
+        calls = []
+
+        def evaluator(boards):
+            calls.append(len(boards))
+            return evaluate_batch(boards)
+
+        searcher = BatchedExpectimax(depth=depth, evaluator=evaluator)
+        action, value = searcher.search(board)
+        assert (action, value) == BatchedExpectimax(depth=depth).search(board)
+
+        chance_sizes, max_sizes, expected_calls = _frontiers(board, depth)
+        assert calls == expected_calls
+        assert searcher.last_stats.chance_visits == sum(chance_sizes)
+        assert searcher.last_stats.max_visits == sum(max_sizes)
+        assert searcher.last_stats.leaf_evals == sum(expected_calls)
@@ -0,0 +1,127 @@
+import numpy as np
+
+from twenty48 import bitboard
+from twenty48.mechanics import slide_and_merge_line
+
+
+def _reference_move(board, action):
+    if action == 3:
+        oriented, undo = board, lambda b: b
+    elif action == 1:
+        oriented, undo = np.fliplr(board), np.fliplr
+    elif action == 0:
+        oriented, undo = board.T, lambda b: b.T
+    else:
+        oriented, undo = np.fliplr(board.T), lambda b: np.fliplr(b).T
+    out = np.zeros_like(oriented)
+    reward = 0
+    for i in range(4):
+        line, line_reward, _ = slide_and_merge_line(oriented[i, :])
+        out[i, :] = line
+        reward += line_reward
+    return undo(out), reward
+
+
+def _random_board(rng):
+    exponents = rng.integers(0, 12, size=(4, 4))
+    return np.where(exponents > 0, 2 ** exponents, 0).astype(np.int64)
+
+
+def test_pack_roundtrip():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        board = _random_board(rng)
+        assert np.array_equal(bitboard.unpack_board(bitboard.pack_board(board)), board)
+
+
+def test_moves_match_reference():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        board = _random_board(rng)
+        packed = bitboard.pack_board(board)
+        for action in bitboard.ACTIONS:
+            expected, expected_reward = _reference_move(board, action)
+            moved, reward = bitboard.move(packed, action)
+            assert np.array_equal(bitboard.unpack_board(moved), expected)
+            assert reward == expected_reward
+
+
+def test_transpose_and_counts():
+    board = np.array(
+        [
+            [2, 0, 4, 0],
+            [0, 8, 0, 0],
+            [16, 0, 0, 2],
+            [0, 0, 32, 0],
+        ],
+        dtype=np.int64,
+    )
+    packed = bitboard.pack_board(board)
+    assert np.array_equal(bitboard.unpack_board(bitboard.transpose(packed)), board.T)
+    assert bitboard.count_empty(packed) == 10
+    assert bitboard.empty_cells(packed) == [int(i) for i in np.flatnonzero(board.reshape(-1) == 0)]
+    assert bitboard.max_exponent(packed) == 5
+    assert bitboard.tile_sum(packed) == int(board.sum())
+
+
+def test_legal_actions_match_moves():
+    rng = np.random.default_rng(2)
+    packed_boards = []
+    for _ in range(300):
+        exponents = rng.integers(0, 4, size=(4, 4)) * rng.integers(0, 2, size=(4, 4))
+        board = np.where(exponents > 0, 2 ** exponents, 0).astype(np.int64)
+        packed = bitboard.pack_board(board)
+        expected = sum(1 << a for a in bitboard.ACTIONS if bitboard.move(packed, a)[0] != packed)
+        assert bitboard.legal_actions(packed) == expected
+        assert bitboard.actions_from_mask(expected) == tuple(a for a in bitboard.ACTIONS if expected >> a & 1)
+        packed_boards.append(packed)
+    batch = bitboard.legal_actions_batch(np.array(packed_boards, dtype=np.uint64))
+    assert batch.tolist() == [bitboard.legal_actions(p) for p in packed_boards]
+
+
+def test_afterstates_match_moves():
+    rng = np.random.default_rng(3)
+    packed_boards = []
+    for _ in range(200):
+        packed = bitboard.pack_board(_random_board(rng))
+        boards, rewards, mask = bitboard.afterstates(packed)
+        for action in bitboard.ACTIONS:
+            moved, reward = bitboard.move(packed, action)
+            assert (boards[action], rewards[action]) == (moved, reward)
+        assert mask == bitboard.legal_actions(packed)
+        packed_boards.append(packed)
+
+    batch_boards, batch_rewards, batch_moved = bitboard.afterstates_batch(np.array(packed_boards, dtype=np.uint64))
+    for i, packed in enumerate(packed_boards):
+        boards, rewards, mask = bitboard.afterstates(packed)
+        assert batch_boards[i].tolist() == list(boards)
+        assert batch_rewards[i].tolist() == list(rewards)
+        assert batch_moved[i].tolist() == [bool(mask >> a & 1) for a in bitboard.ACTIONS]
+
+
+def test_symmetries_commute_with_moves():
+    rng = np.random.default_rng(4)
+    for _ in range(50):
+        board = _random_board(rng)
+        packed = bitboard.pack_board(board)
+        images = bitboard.symmetries(packed)
+        expected = [
+            board,
+            np.fliplr(board),
+            np.flipud(board),
+            np.flipud(np.fliplr(board)),
+            board.T,
+            np.fliplr(board.T),
+            np.flipud(board.T),
+            np.flipud(np.fliplr(board.T)),
+        ]
+        for k, image in enumerate(images):
+            assert np.array_equal(bitboard.unpack_board(image), expected[k])
+            for action in bitboard.ACTIONS:
+                moved, reward = bitboard.move(packed, action)
+                mapped = bitboard.SYMMETRY_ACTIONS[k][action]
+                assert bitboard.move(image, mapped) == (bitboard.symmetries(moved)[k], reward)
+                assert bitboard.INVERSE_SYMMETRY_ACTIONS[k][mapped] == action
+        canon, index = bitboard.canonical(packed)
+        assert canon == min(images) == images[index]
+        assert all(bitboard.canonical(image)[0] == canon for image in images)
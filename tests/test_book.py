@@ -0,0 +1,34 @@
+from twenty48 import bitboard
+from twenty48.ai.book import Book, BookAgent, BookBuilder
+from twenty48.ai.expectimax import ExpectimaxSearcher
+from twenty48.env import Twenty48Env
+
+
+def test_book_round_trip_maps_actions_through_symmetries(tmp_path):
+    board = bitboard.pack_board([[2, 4, 0, 0], [0, 8, 0, 0], [0, 0, 0, 2], [0, 0, 0, 0]])
+    other = bitboard.pack_board([[0, 0, 0, 2], [0, 0, 0, 2], [0, 0, 0, 0], [0, 0, 0, 0]])
+    builder = BookBuilder()
+    builder.add(board, 3, 12.5)
+    builder.add(other, 1, 4.0)
+    book = Book.open(builder.write(tmp_path / "book", {"depth": 4}))
+
+    assert len(book) == 2
+    assert book.meta == {"depth": 4, "entries": 2}
+    assert book.keys.tolist() == sorted(book.keys.tolist())
+    for k, image in enumerate(bitboard.symmetries(board)):
+        assert book.lookup(image) == (bitboard.SYMMETRY_ACTIONS[k][3], 12.5)
+    assert book.lookup(board | 1 << 60) is None
+    assert BookBuilder.from_book(book).write(tmp_path / "copy").read_bytes() == (tmp_path / "book.npy").read_bytes()
+
+
+def test_book_agent_falls_back_to_search(tmp_path):
+    env = Twenty48Env()
+    env.reset(seed=2)
+    builder = BookBuilder()
+    builder.add(env.packed, 2, 1.0)
+    agent = BookAgent(Book.open(builder.write(tmp_path / "book", {"depth": 5})), ExpectimaxSearcher(depth=1))
+    assert agent.choose_action(env) == 2
+    assert agent.completed_depth == 5
+    env.step(2)
+    assert agent.choose_action(env) == ExpectimaxSearcher(depth=1).choose_action(env)
+    assert (agent.hits, agent.misses, agent.completed_depth) == (1, 1, 1)
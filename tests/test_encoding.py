@@ -0,0 +1,40 @@
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+
+from twenty48.bitboard import pack_boards
+from twenty48.ml.dataset import Twenty48ImitationDataset, batch_loader, split_dataset
+from twenty48.ml.encoding import encode_board, encode_boards, encode_packed
+
+
+def _random_boards(count, seed):
+    rng = np.random.default_rng(seed)
+    exponents = rng.integers(0, 16, size=(count, 4, 4))
+    return np.where(exponents > 0, 1 << exponents, 0).astype(np.int16)
+
+
+def test_encode_boards_matches_encode_board():
+    boards = _random_boards(64, seed=0)
+    for max_pow in (15, 11):
+        encoded = encode_boards(boards, max_pow=max_pow)
+        assert encoded.shape == (64, max_pow + 1, 4, 4) and encoded.dtype == np.float32
+        assert np.array_equal(encode_packed(pack_boards(boards), max_pow=max_pow), encoded)
+        for board, expected in zip(boards[:8], encoded[:8]):
+            assert np.array_equal(encode_board(board, max_pow=max_pow), expected)
+    assert np.all(encode_boards(boards).sum(axis=1) == 1)
+
+
+def test_batch_loader_matches_default_loader(tmp_path):
+    boards = _random_boards(50, seed=1)
+    actions = np.random.default_rng(2).integers(0, 4, size=50).astype(np.uint8)
+    np.savez_compressed(tmp_path / "data.npz", boards=boards, actions=actions)
+    dataset = Twenty48ImitationDataset(str(tmp_path / "data.npz"))
+    train_set, _ = split_dataset(dataset, val_ratio=0.2, seed=0)
+
+    torch.manual_seed(3)
+    expected = list(DataLoader(train_set, batch_size=16, shuffle=True))
+    torch.manual_seed(3)
+    batches = list(batch_loader(train_set, batch_size=16, shuffle=True))
+    assert len(batches) == len(expected) == 3
+    for (x, y), (ex, ey) in zip(batches, expected):
+        assert torch.equal(x, ex) and torch.equal(y, ey)
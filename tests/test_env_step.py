@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from twenty48.env import Twenty48Env
 
@@ -60,3 +61,42 @@ def test_seed_reproducibility():
         env2.step(action)
     assert np.array_equal(env1.board, env2.board)
     assert env1.score == env2.score
+
+
+def test_step_fast_matches_step():
+    env1 = Twenty48Env()
+    env2 = Twenty48Env()
+    env1.reset(seed=7)
+    env2.reset(seed=7)
+    for i in range(200):
+        action = i % 4
+        obs, reward, done, _ = env1.step(action)
+        packed, fast_reward, fast_done = env2.step_fast(action)
+        assert packed == env2.packed
+        assert np.array_equal(obs, env2.board)
+        assert (reward, done) == (fast_reward, fast_done)
+        if done:
+            break
+    assert env1.score == env2.score
+    assert not env2.board.flags.writeable
+
+
+def test_32768_tiles_do_not_merge():
+    env = Twenty48Env()
+    env.reset(seed=0)
+    env.board = np.array(
+        [
+            [32768, 32768, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+            [0, 0, 0, 0],
+        ],
+        dtype=np.int64,
+    )
+    obs, reward, _, info = env.step(3)
+    assert info["invalid_move"] is True
+    assert reward == 0
+    assert obs[0].tolist() == [32768, 32768, 0, 0]
+
+    with pytest.raises(ValueError):
+        env.board = np.full((4, 4), 65536, dtype=np.int64)
@@ -0,0 +1,162 @@
+import functools
+import time
+
+from twenty48 import bitboard
+from twenty48.ai.expectimax import ExpectimaxSearcher, adaptive_depth, choose_action
+from twenty48.ai.stats import SearchStats
+from twenty48.ai.transposition import TranspositionTable
+from twenty48.bitboard import afterstates, empty_cells
+from twenty48.env import Twenty48Env
+
+
+def test_transposition_table_bounds_and_depth():
+    table = TranspositionTable(max_entries=2)
+    table.put("a", 2, 1.0)
+    assert table.get("a", 1) == 1.0
+    assert table.get("a", 3) is None
+    table.put("b", 1, 2.0)
+    table.put("c", 1, 3.0)
+    assert len(table) == 2
+    assert table.get("a", 1) is None
+    assert table.evictions == 1
+    assert (table.hits, table.misses) == (1, 2)
+    assert TranspositionTable(max_bytes=4000).max_entries == 20
+
+
+def test_bounded_table_keeps_search_results():
+    env = Twenty48Env()
+    env.reset(seed=3)
+    small = ExpectimaxSearcher(depth=2, table=TranspositionTable(max_entries=16))
+    for _ in range(20):
+        action = small.choose_action(env)
+        assert action == choose_action(env, 2)
+        assert len(small.table) <= 16
+        env.step(action)
+    assert small.table.evictions > 0
+
+
+def test_cached_values_ignore_score():
+    env = Twenty48Env()
+    env.reset(seed=5)
+    searcher = ExpectimaxSearcher(depth=2)
+    first = searcher.search(env.packed)
+    env.score = 1000
+    hits = searcher.table.hits
+    assert searcher.search(env.packed) == first
+    assert searcher.table.hits > hits
+
+
+def test_zero_cutoff_matches_full_expansion():
+    env = Twenty48Env()
+    env.reset(seed=11)
+    for action in (3, 2, 3, 2, 0, 3):
+        env.step(action)
+    full = ExpectimaxSearcher(depth=2, max_cells=16)
+    pruned = ExpectimaxSearcher(depth=2, min_prob=0.0)
+    full_result = full.search(env.packed)
+    pruned_result = pruned.search(env.packed)
+    assert pruned_result[0] == full_result[0]
+    assert abs(pruned_result[1] - full_result[1]) < 1e-9
+
+    cheap = ExpectimaxSearcher(depth=2, min_prob=0.05, max_fours=0)
+    cheap.search(env.packed)
+    assert len(cheap.table) < len(pruned.table)
+
+
+def test_pruned_values_ignore_deeper_cached_entries():
+    env = Twenty48Env()
+    env.reset(seed=11)
+    for action in (3, 2, 3, 2, 0, 3):
+        env.step(action)
+    cold = ExpectimaxSearcher(depth=2, min_prob=0.05).search(env.packed)
+
+    # Root 4-spawns fall below min_prob; searching them deeper first must not
+    # leak into their heuristic leaf values.
+    warm = ExpectimaxSearcher(depth=2, min_prob=0.05)
+    boards, _, mask = afterstates(env.packed)
+    for action in range(4):
+        if mask >> action & 1:
+            for cell in empty_cells(boards[action]):
+                warm.max_value(boards[action] | (2 << 4 * cell), 2)
+    assert warm.search(env.packed) == cold
+
+
+def test_timed_search_respects_budget():
+    env = Twenty48Env()
+    env.reset(seed=4)
+    searcher = ExpectimaxSearcher(time_ms=30, min_prob=1e-4)
+    for _ in range(5):
+        start = time.perf_counter()
+        action = searcher.choose_action(env)
+        assert time.perf_counter() - start < 0.5
+        assert searcher.completed_depth >= 1
+        assert action in (0, 1, 2, 3)
+        env.step(action)
+
+    fixed = ExpectimaxSearcher(depth=2, min_prob=1e-4).search(env.packed)
+    deep = ExpectimaxSearcher(depth=2, time_ms=60_000, min_prob=1e-4).search(env.packed)
+    assert deep == fixed
+
+
+def test_symmetric_search_shares_entries_and_maps_actions():
+    env = Twenty48Env()
+    env.reset(seed=8)
+    for action in (3, 2, 3, 2, 0, 3, 2):
+        env.step(action)
+    plain = ExpectimaxSearcher(depth=2, min_prob=0.0).search(env.packed)
+
+    searcher = ExpectimaxSearcher(depth=2, min_prob=0.0, symmetry=True)
+    action, value = searcher.search(env.packed)
+    assert action == plain[0]
+    assert abs(value - plain[1]) < 1e-9
+
+    size = len(searcher.table)
+    for k, image in enumerate(bitboard.symmetries(env.packed)):
+        mirrored = searcher.search(image)
+        assert mirrored == (bitboard.SYMMETRY_ACTIONS[k][action], value)
+    assert len(searcher.table) == size
+
+
+def test_adaptive_depth_tracks_board_complexity():
+    opening = bitboard.pack_board([[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 4, 0], [0, 0, 0, 0]])
+    crowded = bitboard.pack_board([[2, 4, 8, 16], [32, 64, 128, 256], [512, 2, 4, 8], [16, 32, 0, 0]])
+    assert adaptive_depth(opening) == 2
+    assert adaptive_depth(crowded, max_depth=20) == 8
+    assert adaptive_depth(crowded, max_depth=4) == 4
+
+    searcher = ExpectimaxSearcher(depth_policy=functools.partial(adaptive_depth, max_depth=3))
+    searcher.search(opening)
+    assert searcher.completed_depth == 2
+
+
+def test_node_budget_is_reproducible():
+    env = Twenty48Env()
+    env.reset(seed=12)
+    for action in (3, 2, 3, 2, 0, 3):
+        env.step(action)
+    results = []
+    for _ in range(2):
+        searcher = ExpectimaxSearcher(depth=6, max_nodes=2000, min_prob=1e-3)
+        results.append((searcher.search(env.packed), searcher.completed_depth))
+        assert searcher.nodes <= 2000 + 200
+    assert results[0] == results[1]
+    assert 1 <= results[0][1] < 6
+
+
+def test_choose_action_records_search_stats():
+    env = Twenty48Env()
+    env.reset(seed=13)
+    searcher = ExpectimaxSearcher(depth=2, min_prob=0.01)
+    stats = SearchStats()
+    for _ in range(3):
+        env.step(searcher.choose_action(env, stats))
+    assert stats.searches == 3
+    assert stats.max_visits == searcher.nodes
+    assert stats.chance_visits == searcher.chance_nodes
+    assert stats.table_hits + stats.table_misses == searcher.table.hits + searcher.table.misses
+    assert 0 < stats.leaf_evals <= stats.max_visits
+    assert stats.peak_table_size == len(searcher.table)
+    assert stats.pruned > 0
+    assert set(stats.depth_times) == {2}
+    assert stats.as_dict()["ms_per_search"] > 0
+    assert searcher.last_stats.searches == 1
@@ -0,0 +1,165 @@
+import numpy as np
+
+from twenty48.env import Twenty48Env
+from twenty48.ml.dataset import Twenty48ImitationDataset
+import pytest
+
+from twenty48.ml.generate import (
+    FIELDS,
+    ChunkWriter,
+    GenerateConfig,
+    generate_shard,
+    load_manifest,
+    manifest_path,
+    merge_manifest,
+    pack_arrays,
+    play_game,
+    remove_manifest,
+    shard_path,
+    unpack_arrays,
+    write_manifest,
+)
+
+
+class _MemoryWriter:
+    """Reference writer: keeps every row in memory."""
+
+    def __init__(self):
+        self.columns = {name: [] for name in FIELDS}
+
+    def append(self, *row):
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+
+    def end_game(self, seed, steps):
+        pass
+
+    def arrays(self):
+        arrays = {name: np.asarray(self.columns[name], dtype=dtype) for name, dtype in FIELDS.items()}
+        arrays["boards"] = arrays["boards"].reshape(-1, 4, 4)
+        return arrays
+
+
+def _serial(config, seeds):
+    writer = _MemoryWriter()
+    env = Twenty48Env()
+    for seed in seeds:
+        play_game(env, config.make_searcher(), seed, config, writer)
+    return writer.arrays()
+
+
+class _Crash(Exception):
+    pass
+
+
+class _CrashingWriter(ChunkWriter):
+    def __init__(self, *args, crash_after, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_after = crash_after
+
+    def append(self, *row):
+        if self.crash_after == 0:
+            raise _Crash()
+        self.crash_after -= 1
+        super().append(*row)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_chunk_writer_resumes_after_crash(tmp_path, packed):
+    config = GenerateConfig(depth=1, max_steps=30, packed=packed)
+    seeds = range(5)
+    serial = _serial(config, seeds)
+    if packed:
+        serial = pack_arrays(serial)
+    out = tmp_path / "data.npz"
+
+    # Die partway through the fourth game, with its first rows already in flushed chunks.
+    writer = _CrashingWriter(out, config, chunk_size=7, crash_after=3 * 30 + 12)
+    env = Twenty48Env()
+    with pytest.raises(_Crash):
+        for seed in seeds:
+            play_game(env, config.make_searcher(), seed, config, writer)
+    partial = load_manifest(manifest_path(out))
+    assert 0 < partial["actions"].shape[0] <= 3 * 30
+    assert np.array_equal(partial["actions"], serial["actions"][: partial["actions"].shape[0]])
+
+    writer = ChunkWriter(out, config, chunk_size=7, resume=True)
+    finished = set(writer.completed)
+    assert finished and finished < set(seeds)
+    for seed in seeds:
+        if seed not in finished:
+            play_game(env, config.make_searcher(), seed, config, writer)
+    merged = load_manifest(writer.close())
+    for name, array in serial.items():
+        assert np.array_equal(merged[name], array)
+    assert writer.completed == list(seeds)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_merged_chunks_match_in_memory_dataset(tmp_path, packed):
+    config = GenerateConfig(depth=1, max_steps=30, sample_prob=0.8, packed=packed)
+    serial = _serial(config, range(4))
+    if packed:
+        serial = pack_arrays(serial)
+    out = tmp_path / "data.npz"
+    writer = ChunkWriter(out, config, chunk_size=9)
+    env = Twenty48Env()
+    for seed in range(4):
+        play_game(env, config.make_searcher(), seed, config, writer)
+    manifest = writer.close()
+    assert len(writer.chunks) > 2
+
+    assert merge_manifest(manifest, out) == out
+    remove_manifest(manifest)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data.npz"]
+    with np.load(out) as merged:
+        assert sorted(merged.files) == sorted(serial)
+        for name, array in serial.items():
+            assert merged[name].dtype == array.dtype and np.array_equal(merged[name], array)
+
+
+def test_shards_match_serial_generation(tmp_path):
+    config = GenerateConfig(depth=1, max_steps=40, sample_prob=0.5)
+    serial = _serial(config, range(10, 15))
+
+    out = tmp_path / "data.npz"
+    # Shards may finish in any order; the manifest sorts them by seed.
+    shards = [
+        generate_shard(config, 13, 2, shard_path(out, 1), chunk_size=8),
+        generate_shard(config, 10, 3, shard_path(out, 0), chunk_size=8),
+    ]
+    for shard in shards:
+        assert shard.pop("played") == shard["games"]
+    path = write_manifest(tmp_path / "data.manifest.json", config, shards)
+    merged = load_manifest(path)
+    for name, array in serial.items():
+        assert np.array_equal(merged[name], array)
+
+    dataset = Twenty48ImitationDataset(str(path))
+    assert len(dataset) == serial["actions"].shape[0]
+    assert int(dataset[0][1]) == int(serial["actions"][0])
+
+    # The default --workers output: shards merged into --out, then removed.
+    assert merge_manifest(path, out) == out
+    remove_manifest(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.npz"]
+    with np.load(out) as merged:
+        for name, array in serial.items():
+            assert np.array_equal(merged[name], array)
+
+
+def test_packed_dataset_round_trip(tmp_path):
+    config = GenerateConfig(depth=1, max_steps=30, sample_prob=0.7)
+    arrays = _serial(config, range(3))
+    packed = pack_arrays(arrays)
+    assert packed["packed"].dtype == np.uint64 and "boards" not in packed
+    for name, array in unpack_arrays(packed).items():
+        assert np.array_equal(array, arrays[name]) and array.dtype == arrays[name].dtype
+
+    np.savez_compressed(tmp_path / "plain.npz", **arrays)
+    np.savez_compressed(tmp_path / "packed.npz", **packed)
+    plain_set = Twenty48ImitationDataset(str(tmp_path / "plain.npz"))
+    packed_set = Twenty48ImitationDataset(str(tmp_path / "packed.npz"))
+    assert len(plain_set) == len(packed_set)
+    for idx in (0, len(plain_set) - 1):
+        assert all(np.array_equal(a.numpy(), b.numpy()) for a, b in zip(plain_set[idx], packed_set[idx]))
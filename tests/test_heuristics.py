@@ -0,0 +1,42 @@
+import numpy as np
+
+from twenty48.ai.heuristics import DEFAULT_WEIGHTS, TableEvaluator, evaluate, evaluate_packed
+from twenty48.bitboard import pack_board
+
+
+def _random_boards(count, seed):
+    rng = np.random.default_rng(seed)
+    exponents = rng.integers(0, 12, size=(count, 4, 4))
+    exponents[rng.random((count, 4, 4)) < 0.3] = 0
+    return np.where(exponents > 0, 1 << exponents, 0)
+
+
+def test_table_evaluator_matches_evaluate():
+    boards = _random_boards(200, seed=0)
+    weights = dict(DEFAULT_WEIGHTS, merges=0.5)
+    evaluator = TableEvaluator(weights)
+    for board in boards:
+        packed = pack_board(board)
+        assert abs(evaluate_packed(packed) - evaluate(board)) < 1e-9
+        assert abs(evaluator(packed) - evaluate(board, weights)) < 1e-9
+    assert evaluate_packed(0) == evaluate(np.zeros((4, 4), dtype=np.int64))
+
+
+def test_table_evaluator_rebuilds_after_weight_change(monkeypatch):
+    builds = []
+    build = TableEvaluator._build
+    monkeypatch.setattr(TableEvaluator, "_build", lambda self: builds.append(1) or build(self))
+    board = _random_boards(1, seed=1)[0]
+    packed = pack_board(board)
+    evaluator = TableEvaluator()
+    assert abs(evaluator(packed) - evaluate(board)) < 1e-9
+    weights = {"empty": 1.0, "max_tile": 3.0}
+    evaluator.weights = weights
+    assert abs(evaluator(packed) - evaluate(board, weights)) < 1e-9
+    assert abs(evaluator.batch([packed])[0] - evaluate(board, weights)) < 1e-9
+    assert len(builds) == 2
+
+    # Reassigning equal weights keeps the built tables.
+    evaluator.weights = dict(weights)
+    assert abs(evaluator(packed) - evaluate(board, weights)) < 1e-9
+    assert len(builds) == 2
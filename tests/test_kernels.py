@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from twenty48 import kernels
+from twenty48.ai.heuristics import _log2_board, _monotonicity_py, _smoothness_py
+from twenty48.mechanics import _slide_and_merge_line_py, slide_and_merge_line
+from twenty48.rules import _has_moves_py, _has_moves_scan, has_moves
+
+
+def _random_boards(count, seed, high=12):
+    rng = np.random.default_rng(seed)
+    exponents = rng.integers(1, high, size=(count, 4, 4))
+    exponents[rng.random((count, 4, 4)) < 0.2] = 0
+    return np.where(exponents > 0, 1 << exponents, 0).astype(np.int64)
+
+
+def test_slide_line_matches_python():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        line = np.where(rng.random(4) < 0.3, 0, 1 << rng.integers(1, 5, size=4)).astype(np.int64)
+        expected = _slide_and_merge_line_py(line)
+        output, reward, merged, count = kernels.slide_line(line)
+        assert np.array_equal(output, expected[0])
+        assert reward == expected[1]
+        assert merged[:count].tolist() == expected[2]
+        for source in (line.tolist(), iter(line.tolist()), (int(x) for x in line)):
+            got = slide_and_merge_line(source)
+            assert np.array_equal(got[0], expected[0]) and got[1:] == expected[1:]
+
+
+def test_has_moves_matches_python():
+    # Few distinct tiles and no empties give a mix of live and dead boards.
+    boards = np.concatenate([_random_boards(300, seed=1), _random_boards(300, seed=2, high=16)])
+    boards[300:][boards[300:] == 0] = 2
+    boards[-1] = 32768
+    boards[-2, 0] = 65536
+    outcomes = set()
+    for board in boards:
+        # The plain cell scan is the reference; _has_moves_py uses the packed tables.
+        expected = _has_moves_scan(board)
+        assert bool(kernels.has_moves(board)) == expected
+        assert has_moves(board) == expected
+        assert _has_moves_py(board) == expected
+        outcomes.add(expected)
+    assert outcomes == {True, False}
+
+
+def test_heuristic_kernels_match_python():
+    for board in _random_boards(200, seed=3):
+        log_board = _log2_board(board)
+        assert kernels.smoothness(log_board) == _smoothness_py(log_board)
+        assert kernels.monotonicity(log_board) == _monotonicity_py(log_board)
+
+
+def test_numba_kernels_are_compiled():
+    pytest.importorskip("numba")
+    assert kernels.HAVE_NUMBA
+    boards = _random_boards(50, seed=4)
+    for board in boards:
+        line = board[0]
+        output, reward, merged, count = kernels.slide_line(line)
+        expected = _slide_and_merge_line_py(line)
+        assert np.array_equal(output, expected[0]) and (reward, merged[:count].tolist()) == expected[1:]
+        assert kernels.has_moves(board) == _has_moves_scan(board)
+        log_board = _log2_board(board)
+        assert kernels.smoothness(log_board) == _smoothness_py(log_board)
+        assert kernels.monotonicity(log_board) == _monotonicity_py(log_board)
+    for kernel in (kernels.slide_line, kernels.has_moves, kernels.smoothness, kernels.monotonicity):
+        assert kernel.signatures, kernel
@@ -0,0 +1,31 @@
+import numpy as np
+
+from twenty48 import bitboard
+from twenty48.ai.montecarlo import MonteCarloAgent, rollout_returns
+from twenty48.env import Twenty48Env
+
+
+def test_rollouts_are_seeded_and_stop_at_game_over():
+    dead = bitboard.pack_board([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 4], [4, 2, 4, 2]])
+    opening = bitboard.pack_board([[2, 0, 0, 0], [0, 0, 0, 0], [0, 2, 0, 0], [0, 0, 0, 0]])
+    boards = np.array([dead, opening, opening], dtype=np.uint64)
+    for policy in ("random", "greedy"):
+        first = rollout_returns(boards, 30, np.random.default_rng(3), policy)
+        assert np.array_equal(first, rollout_returns(boards, 30, np.random.default_rng(3), policy))
+        assert first[0] == 0
+        assert np.all(first[1:] > 0)
+
+
+def test_agent_is_reproducible_for_any_worker_count():
+    env = Twenty48Env()
+    env.reset(seed=5)
+    for action in (3, 2, 3, 2):
+        env.step(action)
+    serial = MonteCarloAgent(rollouts=20, horizon=10, seed=1, chunk_size=16)
+    expected = [serial.search(env.packed) for _ in range(2)]
+    assert expected[0] != expected[1]
+    with MonteCarloAgent(rollouts=20, horizon=10, seed=1, chunk_size=16, workers=2) as pooled:
+        assert [pooled.search(env.packed) for _ in range(2)] == expected
+    serial.reset(1)
+    assert serial.search(env.packed) == expected[0]
+    assert bitboard.legal_actions(env.packed) >> expected[0][0] & 1
@@ -0,0 +1,61 @@
+import numpy as np
+
+from twenty48 import bitboard
+from twenty48.ai.expectimax import ExpectimaxSearcher
+from twenty48.ai.ntuple import NTupleNetwork, train_td
+
+
+def _board():
+    return bitboard.pack_board([[2, 4, 8, 0], [0, 16, 2, 4], [32, 0, 0, 2], [4, 2, 0, 0]])
+
+
+def test_features_index_pattern_exponents_over_symmetries():
+    network = NTupleNetwork([(0, 1, 4, 5), (2, 7, 3)])
+    board = _board()
+    features = network.features(board)
+    assert len(features) == 16
+    for k, image in enumerate(bitboard.symmetries(board)):
+        cells = [(image >> (4 * i)) & 0xF for i in range(16)]
+        square = cells[0] | cells[1] << 4 | cells[4] << 8 | cells[5] << 12
+        odd = cells[2] | cells[7] << 4 | cells[3] << 8
+        assert features[2 * k : 2 * k + 2] == [square, 16**4 + odd]
+
+    network.weights[:] = np.random.default_rng(0).random(network.weights.shape)
+    assert all(abs(network.value(image) - network.value(board)) < 1e-4 for image in bitboard.symmetries(board))
+
+
+def test_batch_features_and_values_match_single_boards():
+    network = NTupleNetwork([(0, 1, 2, 3), (1, 5, 6), (5, 6, 9, 10, 13, 14)])
+    network.weights[:] = np.random.default_rng(1).random(network.weights.shape)
+    boards, rewards, mask = bitboard.afterstates(_board())
+    legal = bitboard.actions_from_mask(mask)
+    packed = np.array([boards[action] for action in legal], dtype=np.uint64)
+    assert network.features_batch(packed).tolist() == [network.features(board) for board in packed.tolist()]
+    values = network.values(packed)
+    assert values.tolist() == [network.value(board) for board in packed.tolist()]
+    best = int(np.argmax([rewards[action] + value for action, value in zip(legal, values)]))
+    assert network.best_action(_board()) == (legal[best], rewards[legal[best]] + values[best])
+
+
+def test_update_moves_value_toward_target():
+    network = NTupleNetwork()
+    board = _board()
+    network.update(board, 10.0, learning_rate=0.5)
+    assert abs(network.value(board) - 5.0) < 1e-4
+
+
+def test_td_training_is_seeded_and_round_trips(tmp_path):
+    first, second = NTupleNetwork(), NTupleNetwork()
+    scores = train_td(first, 3, seed=7)
+    assert train_td(second, 3, seed=7) == scores
+    assert np.array_equal(first.weights, second.weights)
+    assert np.any(first.weights)
+    train_td(NTupleNetwork(), 2, lam=0.5, seed=7)
+
+    loaded = NTupleNetwork.load(first.save(tmp_path / "ntuple"))
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.patterns == first.patterns
+    assert loaded.best_action(_board()) == first.best_action(_board())
+
+    searcher = ExpectimaxSearcher(depth=1, reward_weight=1.0, evaluator=loaded.state_value)
+    assert searcher.search(_board())[0] in bitboard.actions_from_mask(bitboard.legal_actions(_board()))
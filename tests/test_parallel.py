@@ -0,0 +1,36 @@
+import pytest
+
+from twenty48.ai.parallel import ParallelExpectimax
+from twenty48.env import Twenty48Env
+
+
+def _boards(actions):
+    env = Twenty48Env()
+    env.reset(seed=21)
+    boards = []
+    for action in actions:
+        env.step(action)
+        boards.append(env.packed)
+    return boards
+
+
+@pytest.mark.parametrize("options", [{"depth": 3}, {"depth": 3, "min_prob": 1e-3}])
+def test_parallel_results_do_not_depend_on_worker_count(options):
+    # Depth 3 reaches boards at several remaining depths, so shared deep
+    # table entries would change values if blocks depended on the pool.
+    boards = _boards((3, 2, 3, 2, 1, 2, 3, 0))
+    results = []
+    for workers in (1, 3):
+        with ParallelExpectimax(workers=workers, **options) as search:
+            results.append([search.search(board) for board in boards])
+    assert results[0] == results[1]
+
+
+def test_worker_tables_are_cleared_per_search():
+    boards = _boards((3, 2, 3, 0))
+    with ParallelExpectimax(workers=2, depth=3, min_prob=1e-3) as search:
+        first = [search.search(board) for board in boards]
+        nodes = search.last_stats.max_visits
+        assert [search.search(board) for board in reversed(boards)] == first[::-1]
+        search.search(boards[-1])
+        assert search.last_stats.max_visits == nodes
@@ -0,0 +1,50 @@
+import numpy as np
+
+from twenty48.mechanics import slide_and_merge_line
+from twenty48.rules import _has_moves_py, has_moves
+
+
+def test_has_moves_beyond_packed_tiles():
+    board = np.array(
+        [
+            [65536, 2, 4, 8],
+            [2, 4, 8, 16],
+            [4, 8, 16, 32],
+            [8, 16, 32, 64],
+        ],
+        dtype=np.int64,
+    )
+    assert not has_moves(board)
+    assert not _has_moves_py(board)
+
+    board[3, 3] = 32
+    assert has_moves(board)
+    assert _has_moves_py(board)
+
+    # Like the packed rules, tiles at or above the 32768 cap never merge.
+    board[3, 3] = 64
+    board[0, 1] = 65536
+    assert not has_moves(board)
+    assert not _has_moves_py(board)
+    board[0, 1] = 0
+    assert has_moves(board)
+
+
+def test_rules_and_line_slides_agree_on_capped_pairs():
+    for tile in (32768, 65536):
+        board = np.array(
+            [
+                [tile, tile, 2, 4],
+                [2, 4, 8, 16],
+                [4, 8, 16, 32],
+                [8, 16, 32, 64],
+            ],
+            dtype=np.int64,
+        )
+        assert not has_moves(board)
+        for line in (board[0], board[0, ::-1], board[:, 0], board[::-1, 0]):
+            out, reward, merged = slide_and_merge_line(line)
+            assert (reward, merged) == (0, [])
+            assert out.tolist() == [int(x) for x in line if x]
+    out, reward, merged = slide_and_merge_line([16384, 16384, 0, 0])
+    assert (out.tolist(), reward, merged) == ([32768, 0, 0, 0], 32768, [32768])
@@ -0,0 +1,54 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from twenty48.env import Twenty48Env
+from twenty48.ml.dataset import Twenty48ImitationDataset
+from twenty48.ml.generate import ChunkWriter, GenerateConfig, load_manifest, manifest_path, play_game
+from twenty48.ml.storage import convert_to_npy_dir, open_npy_dir
+
+
+def _write_sources(tmp_path):
+    config = GenerateConfig(depth=1, max_steps=25, packed=True)
+    plain_config = GenerateConfig(depth=1, max_steps=25)
+    plain = ChunkWriter(tmp_path / "reference.npz", plain_config, chunk_size=16)
+    chunks = ChunkWriter(tmp_path / "chunked.npz", config, chunk_size=16)
+    env = Twenty48Env()
+    for seed in range(3):
+        play_game(env, plain_config.make_searcher(), seed, plain_config, plain)
+        play_game(env, config.make_searcher(), seed, config, chunks)
+    chunks.close()
+    arrays = load_manifest(plain.close())
+    np.savez_compressed(tmp_path / "plain.npz", **arrays)
+    return arrays, manifest_path(tmp_path / "chunked.npz")
+
+
+def test_convert_npz_and_manifest_to_npy_dir(tmp_path):
+    arrays, manifest = _write_sources(tmp_path)
+    plain = open_npy_dir(convert_to_npy_dir(tmp_path / "plain.npz", tmp_path / "plain"))
+    unpacked = open_npy_dir(convert_to_npy_dir(manifest, tmp_path / "unpacked", layout="unpacked"))
+    for name, array in arrays.items():
+        assert isinstance(plain[name], np.memmap)
+        assert np.array_equal(plain[name], array) and np.array_equal(unpacked[name], array)
+
+    packed = open_npy_dir(convert_to_npy_dir(tmp_path / "plain.npz", tmp_path / "packed", layout="packed"))
+    assert "boards" not in packed and packed["packed"].dtype == np.uint64
+
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "keep.txt").write_text("x")
+    with pytest.raises(FileExistsError):
+        convert_to_npy_dir(tmp_path / "plain.npz", tmp_path / "other")
+
+
+def test_npy_dir_dataset_is_mapped_and_pickles_by_path(tmp_path):
+    arrays, manifest = _write_sources(tmp_path)
+    path = convert_to_npy_dir(manifest, tmp_path / "packed")
+    dataset = Twenty48ImitationDataset(str(path))
+    assert isinstance(dataset.packed, np.memmap)
+    clone = pickle.loads(pickle.dumps(dataset))
+    assert len(pickle.dumps(dataset)) < 1000
+    assert isinstance(clone.packed, np.memmap) and len(clone) == arrays["actions"].shape[0]
+    reference = Twenty48ImitationDataset(str(tmp_path / "plain.npz"))
+    for idx in (0, len(clone) - 1):
+        assert all(np.array_equal(a.numpy(), b.numpy()) for a, b in zip(clone[idx], reference[idx]))
@@ -0,0 +1,31 @@
+import numpy as np
+
+from twenty48.ai.tuning import CrossEntropyTuner, race
+
+
+def test_race_drops_only_clearly_worse_candidates():
+    scores = np.array(
+        [
+            [100.0, 200.0, 150.0, 120.0],
+            [110.0, 190.0, 160.0, 125.0],
+            [10.0, 20.0, 15.0, 12.0],
+            [120.0, 100.0, 170.0, 90.0],
+        ]
+    )
+    alive = race(scores, np.ones(4, dtype=bool), keep=2, z=2.0)
+    assert alive.tolist() == [True, True, False, True]
+
+
+def test_tuner_resumes_from_checkpoint(tmp_path):
+    options = dict(population=4, games=2, race_rounds=2, depth=1, max_steps=30, seed=0)
+    with CrossEntropyTuner(**options) as tuner:
+        straight = tuner.run(2)
+
+    path = tmp_path / "tune.json"
+    with CrossEntropyTuner(checkpoint=path, **options) as tuner:
+        tuner.run(1)
+    with CrossEntropyTuner(checkpoint=path, **options) as tuner:
+        assert tuner.generation == 1
+        resumed = tuner.run(2)
+        assert len(tuner.history) == 2 and tuner.best is not None
+    assert resumed == straight
@@ -0,0 +1,80 @@
+import numpy as np
+
+from twenty48 import bitboard
+from twenty48.vec_env import VecTwenty48Env
+
+
+def _pack(rows):
+    return bitboard.pack_board(np.array(rows, dtype=np.int64))
+
+
+def test_batch_helpers_match_scalar():
+    rng = np.random.default_rng(0)
+    exponents = rng.integers(0, 12, size=(64, 4, 4))
+    boards = np.where(exponents > 0, 2 ** exponents, 0).astype(np.int64)
+    packed = bitboard.pack_boards(boards)
+    assert packed.tolist() == [bitboard.pack_board(b) for b in boards]
+    assert np.array_equal(bitboard.unpack_boards(packed), boards)
+
+    actions = rng.integers(0, 4, size=64)
+    moved, rewards = bitboard.move_batch(packed, actions)
+    for i, action in enumerate(actions):
+        assert (int(moved[i]), int(rewards[i])) == bitboard.move(int(packed[i]), int(action))
+
+
+def test_step_invalid_and_spawn():
+    env = VecTwenty48Env(2, seed=0)
+    env.reset()
+    env.boards = np.array(
+        [
+            _pack([[2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]),
+            _pack([[2, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]),
+        ],
+        dtype=np.uint64,
+    )
+    boards, rewards, dones, invalid = env.step(np.array([3, 3]))
+    assert invalid.tolist() == [True, False]
+    assert rewards.tolist() == [0, 4]
+    assert dones.tolist() == [False, False]
+    assert bitboard.count_empty(int(boards[0])) == 15
+    assert bitboard.count_empty(int(boards[1])) == 14
+    assert env.scores.tolist() == [0, 4]
+
+
+def test_auto_reset_and_reproducibility():
+    full = _pack([[2, 4, 2, 4], [4, 2, 4, 2], [2, 4, 2, 8], [8, 16, 32, 32]])
+    env = VecTwenty48Env(1, seed=0)
+    env.reset()
+    env.boards = np.array([full], dtype=np.uint64)
+    _, rewards, dones, _ = env.step(np.array([3]))
+    assert rewards.tolist() == [64]
+    assert dones.tolist() == [True]
+    assert env.final_scores.tolist() == [64]
+    assert bitboard.count_empty(int(env.boards[0])) == 14
+
+    results = []
+    for _ in range(2):
+        env = VecTwenty48Env(8)
+        env.reset(seeds=list(range(8)))
+        for step in range(50):
+            env.step(np.full(8, step % 4))
+        results.append((env.boards.copy(), env.scores.copy()))
+    assert np.array_equal(results[0][0], results[1][0])
+    assert np.array_equal(results[0][1], results[1][1])
+
+
+def test_env_streams_match_single_env_runs():
+    seeds = [7, 3, 11, 5]
+    actions = np.random.default_rng(1).integers(0, 4, size=(300, len(seeds)))
+    env = VecTwenty48Env(len(seeds))
+    batch = [env.reset(seeds=seeds)]
+    for step_actions in actions:
+        batch.append(env.step(step_actions)[0])
+    batch = np.array(batch)
+
+    for i, seed in enumerate(seeds):
+        single = VecTwenty48Env(1)
+        boards = [single.reset(seeds=[seed])]
+        for step_actions in actions:
+            boards.append(single.step(step_actions[i : i + 1])[0])
+        assert np.array_equal(np.array(boards)[:, 0], batch[:, i])